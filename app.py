@@ -1,19 +1,37 @@
 import os
+import sys
 import csv
+import re
 import hashlib
+import heapq
 import random
+import string
+import time
 import logging
+import sqlite3
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import attrgetter, itemgetter
+from types import MappingProxyType
 from datetime import datetime, timezone, timedelta
-import pytz
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from zoneinfo import ZoneInfo
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, g, has_request_context, Response
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as SessionBase, contains_eager, joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from functools import wraps
+from markupsafe import Markup
+from functools import wraps, lru_cache
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 import atexit
+from constants import VALID_VB_SCORES
 
 # Suppress absl logging warnings from Google AI libraries
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress TensorFlow warnings
@@ -34,24 +52,57 @@ except ImportError:
     GEMINI_AVAILABLE = False
     logging.warning("Google Generative AI package not installed. AI messages will use fallback templates only.")
 
+# Faster JSON encoding for large prediction payloads
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Riga timezone
-RIGA_TZ = pytz.timezone('Europe/Riga')
+RIGA_TZ = ZoneInfo('Europe/Riga')
+
+def get_utc_now():
+    """Get current naive UTC time, computed once per request"""
+    if has_request_context():
+        if 'utc_now' not in g:
+            g.utc_now = datetime.utcnow()
+        return g.utc_now
+    return datetime.utcnow()
 
 def get_riga_time():
-    """Get current time in Riga timezone"""
+    """Get current time in Riga timezone, computed once per request"""
+    if has_request_context():
+        if 'riga_now' not in g:
+            g.riga_now = get_utc_now().replace(tzinfo=timezone.utc).astimezone(RIGA_TZ)
+        return g.riga_now
     return datetime.now(RIGA_TZ)
 
+def get_riga_now_naive():
+    """Current Riga wall-clock time without tzinfo, comparable with the naive Riga deadlines stored in the DB"""
+    if has_request_context():
+        if 'riga_now_naive' not in g:
+            g.riga_now_naive = get_riga_time().replace(tzinfo=None)
+        return g.riga_now_naive
+    return get_riga_time().replace(tzinfo=None)
+
 def to_riga_time(dt):
     """Convert datetime to Riga timezone"""
     if dt is None:
         return None
     if dt.tzinfo is None:
         # Assume naive datetimes are in Riga timezone
-        return RIGA_TZ.localize(dt)
+        return dt.replace(tzinfo=RIGA_TZ)
     return dt.astimezone(RIGA_TZ)
 
 app = Flask(__name__)
 
+def fast_jsonify(obj):
+    """Serialize a JSON response with orjson when available, falling back to jsonify"""
+    if ORJSON_AVAILABLE:
+        return Response(orjson.dumps(obj), mimetype='application/json')
+    return jsonify(obj)
+
 # Team name to country code mapping for flags - 2025 Men's World Championship
 TEAM_COUNTRY_MAPPING = {
     'Algeria': 'dz',
@@ -90,41 +141,61 @@ TEAM_COUNTRY_MAPPING = {
     'USA': 'us'
 }
 
+# Freeze the mapping with interned keys so lookups with interned DB team names hit on identity
+TEAM_COUNTRY_MAPPING = MappingProxyType({sys.intern(name): sys.intern(code)
+                                         for name, code in TEAM_COUNTRY_MAPPING.items()})
+
+# Case-insensitive fallback for team names typed differently in CSV uploads
+_TEAM_CODE_BY_CASEFOLD = {name.casefold(): code for name, code in TEAM_COUNTRY_MAPPING.items()}
+
+_TEAM_FLAG_TEMPLATE = Markup('<span class="team-with-flag"><span class="fi fi-{} {}"></span>{}</span>')
+
+# Flag HTML for known teams with the default flag class, built once at import
+_TEAM_FLAG_HTML = {name: _TEAM_FLAG_TEMPLATE.format(code, 'team-flag', name)
+                   for name, code in TEAM_COUNTRY_MAPPING.items()}
+
 def get_country_code(team_name):
     """Get country code for team name, return None if not found"""
-    return TEAM_COUNTRY_MAPPING.get(team_name)
+    country_code = TEAM_COUNTRY_MAPPING.get(team_name)
+    if country_code is None and team_name:
+        country_code = _TEAM_CODE_BY_CASEFOLD.get(team_name.strip().casefold())
+    return country_code
 
 def format_team_with_flag(team_name, flag_class='team-flag'):
     """Format team name with flag HTML if country code exists"""
+    if flag_class == 'team-flag' and team_name in _TEAM_FLAG_HTML:
+        return _TEAM_FLAG_HTML[team_name]
     country_code = get_country_code(team_name)
     if country_code:
-        return f'<span class="team-with-flag"><span class="fi fi-{country_code} {flag_class}"></span>{team_name}</span>'
+        return _TEAM_FLAG_TEMPLATE.format(country_code, flag_class, team_name)
     return team_name
 
 # Template filters for Riga timezone
+@lru_cache(maxsize=4096)
+def format_riga_datetime(dt, format):
+    """Convert datetime to Riga timezone and format it; memoized because pages render the same game times repeatedly"""
+    return to_riga_time(dt).strftime(format)
+
 @app.template_filter('riga_datetime')
 def riga_datetime_filter(dt, format='%Y-%m-%d %H:%M'):
     """Convert datetime to Riga timezone and format it"""
     if dt is None:
         return ''
-    riga_dt = to_riga_time(dt)
-    return riga_dt.strftime(format)
+    return format_riga_datetime(dt, format)
 
 @app.template_filter('riga_date')
 def riga_date_filter(dt):
     """Convert datetime to Riga timezone date"""
     if dt is None:
         return ''
-    riga_dt = to_riga_time(dt)
-    return riga_dt.strftime('%Y-%m-%d')
+    return format_riga_datetime(dt, '%Y-%m-%d')
 
 @app.template_filter('riga_time')
 def riga_time_filter(dt):
     """Convert datetime to Riga timezone time"""
     if dt is None:
         return ''
-    riga_dt = to_riga_time(dt)
-    return riga_dt.strftime('%H:%M')
+    return format_riga_datetime(dt, '%H:%M')
 
 # Register template functions
 app.jinja_env.globals['get_country_code'] = get_country_code
@@ -139,11 +210,37 @@ if database_url.startswith('postgres://'):
 if database_url.startswith('postgresql://'):
     # Replace postgresql:// with postgresql+psycopg:// for psycopg3
     database_url = database_url.replace('postgresql://', 'postgresql+psycopg://', 1)
+    # Pool sized per gunicorn worker; override via env to stay under the server's connection limit
     app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 40)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
         'pool_pre_ping': True,
-        'pool_recycle': 300,
+        'pool_recycle': 1800,
+        'connect_args': {
+            # Server-side prepare statements psycopg sees repeatedly; our queries are short OLTP, so skip JIT
+            'prepare_threshold': 5,
+            'options': '-c jit=off',
+        },
+    }
+    if os.environ.get('DB_ECHO_POOL') == '1':
+        app.config['SQLALCHEMY_ENGINE_OPTIONS']['echo_pool'] = 'debug'
+elif database_url.startswith('sqlite'):
+    # Local development: let request threads share connections
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'connect_args': {'check_same_thread': False},
     }
 
+    @event.listens_for(Engine, 'connect')
+    def _enable_sqlite_wal(dbapi_connection, connection_record):
+        """Use WAL so readers do not block on the writer during development, and enforce
+        foreign keys like PostgreSQL does so ON DELETE CASCADE behaves the same"""
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA foreign_keys=ON')
+            cursor.close()
+
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'uploads'
@@ -156,6 +253,23 @@ login_manager.login_view = 'login'
 login_manager.login_message = 'Please log in to access this page.'
 login_manager.login_message_category = 'info'
 
+def dialect_insert(model):
+    """INSERT construct with ON CONFLICT (upsert) support for the active database"""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+# Per-user aggregates returned by User.score_stats for users without predictions
+EMPTY_SCORE_STATS = {
+    'match_points': 0,
+    'tournament_points': 0,
+    'total_score': 0,
+    'filled': 0,
+    'finished': 0,
+    'correct': 0,
+    'finished_correct': 0
+}
+
 # Database Models
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -166,7 +280,16 @@ class User(UserMixin, db.Model):
     is_verified = db.Column(db.Boolean, default=True)  # Set to True for simplicity
     password_reset_required = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    predictions = db.relationship('Prediction', backref='user', lazy=True, cascade='all, delete-orphan')
+    predictions = db.relationship('Prediction', back_populates='user', lazy=True, cascade='all, delete-orphan')
+    # Loaded per query where needed (race chart, profile) rather than on every current_user
+    tournament_prediction = db.relationship('TournamentPrediction', back_populates='user', uselist=False)
+    # Denormalized copies of score_stats, refreshed on commit; NULL means "not computed yet".
+    # Rows written by raw SQL (restores, imports) are repaired by the admin points recalculation
+    total_score = db.Column(db.Integer, default=0, server_default='0')
+    filled_count = db.Column(db.Integer, default=0, server_default='0')
+    finished_count = db.Column(db.Integer, default=0, server_default='0')
+    correct_count = db.Column(db.Integer, default=0, server_default='0')
+    finished_correct_count = db.Column(db.Integer, default=0, server_default='0')
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -174,30 +297,98 @@ class User(UserMixin, db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
+    @staticmethod
+    def score_stats(user_ids=None, db_session=None):
+        """Aggregate prediction stats per user in a single query, keyed by user_id"""
+        db_session = db_session or db.session
+        finished = Game.is_finished == True
+        real = Prediction.team1_score.isnot(None)
+        scored = Prediction.points.isnot(None)
+        query = (db_session.query(
+                    Prediction.user_id,
+                    db.func.coalesce(db.func.sum(Prediction.points), 0),
+                    db.func.sum(db.case((db.and_(real, Prediction.team2_score.isnot(None)), 1), else_=0)),
+                    db.func.sum(db.case((db.and_(finished, real, scored), 1), else_=0)),
+                    db.func.sum(db.case((db.and_(finished, Prediction.points >= 2), 1), else_=0)),
+                    db.func.sum(db.case((db.and_(finished, real, Prediction.points >= 2), 1), else_=0)))
+                 .join(Game, Prediction.game_id == Game.id)
+                 .group_by(Prediction.user_id))
+        tournament_query = db_session.query(TournamentPrediction.user_id, TournamentPrediction.points_earned)
+        if user_ids is not None:
+            query = query.filter(Prediction.user_id.in_(user_ids))
+            tournament_query = tournament_query.filter(TournamentPrediction.user_id.in_(user_ids))
+
+        stats = {}
+        for user_id, match_points, filled, finished_count, correct, finished_correct in query:
+            stats[user_id] = dict(EMPTY_SCORE_STATS,
+                                  match_points=match_points,
+                                  filled=filled,
+                                  finished=finished_count,
+                                  correct=correct,
+                                  finished_correct=finished_correct)
+        for user_id, points_earned in tournament_query:
+            stats.setdefault(user_id, dict(EMPTY_SCORE_STATS))['tournament_points'] = points_earned or 0
+        for user_stats in stats.values():
+            user_stats['total_score'] = user_stats['match_points'] + user_stats['tournament_points']
+        return stats
+
+    @staticmethod
+    def refresh_stored_stats(user_ids=None, db_session=None):
+        """Recompute the denormalized score columns for the given users (all users when None)"""
+        db_session = db_session or db.session
+        stats = User.score_stats(user_ids, db_session)
+        if user_ids is None:
+            user_ids = db_session.scalars(db.select(User.id)).all()
+        rows = []
+        for user_id in user_ids:
+            user_stats = stats.get(user_id, EMPTY_SCORE_STATS)
+            rows.append({
+                'id': user_id,
+                'total_score': user_stats['total_score'],
+                'filled_count': user_stats['filled'],
+                'finished_count': user_stats['finished'],
+                'correct_count': user_stats['correct'],
+                'finished_correct_count': user_stats['finished_correct']
+            })
+        if rows:
+            db_session.execute(db.update(User), rows)
+
+    @staticmethod
+    def prefetch_score_stats(users):
+        """Attach aggregated stats to each user so the get_* methods skip per-user queries"""
+        stats = User.score_stats([u.id for u in users])
+        for user in users:
+            user._score_stats = stats.get(user.id, EMPTY_SCORE_STATS)
+        return users
+
+    def _get_score_stats(self):
+        prefetched = getattr(self, '_score_stats', None)
+        if prefetched is not None:
+            return prefetched
+        if self.total_score is not None:
+            return {
+                'total_score': self.total_score,
+                'filled': self.filled_count or 0,
+                'finished': self.finished_count or 0,
+                'correct': self.correct_count or 0,
+                'finished_correct': self.finished_correct_count or 0
+            }
+        return User.score_stats([self.id]).get(self.id, EMPTY_SCORE_STATS)
+
     def get_total_score(self):
-        match_points = sum([p.points for p in self.predictions if p.points is not None])
-        tournament_points = self.tournament_prediction.points_earned if self.tournament_prediction else 0
-        return match_points + tournament_points
+        return self._get_score_stats()['total_score']
     
     def get_total_predictions(self):
         """Count only predictions for finished games"""
-        return len([p for p in self.predictions 
-                   if p.team1_score is not None 
-                   and p.game.is_finished 
-                   and p.points is not None])
+        return self._get_score_stats()['finished']
     
     def get_all_predictions_filled(self):
         """Count all predictions that have been filled out (regardless of deadline)"""
-        return len([p for p in self.predictions 
-                   if p.team1_score is not None 
-                   and p.team2_score is not None])
+        return self._get_score_stats()['filled']
     
     def get_correct_predictions(self):
         """Count only predictions with 2+ points (truly correct predictions)"""
-        return len([p for p in self.predictions 
-                   if p.points is not None 
-                   and p.points >= 2
-                   and p.game.is_finished])
+        return self._get_score_stats()['correct']
     
     def get_finished_predictions(self):
         """Get all predictions for finished games"""
@@ -208,26 +399,35 @@ class User(UserMixin, db.Model):
     
     def get_accuracy_percentage(self):
         """Calculate accuracy percentage based on finished games only"""
-        finished_predictions = self.get_finished_predictions()
-        if not finished_predictions:
+        stats = self._get_score_stats()
+        if not stats['finished']:
             return 0.0
         
-        correct_count = len([p for p in finished_predictions if p.points >= 2])
-        return round((correct_count / len(finished_predictions)) * 100, 1)
+        return round((stats['finished_correct'] / stats['finished']) * 100, 1)
     
     def get_prediction_breakdown(self):
         """Get detailed breakdown of prediction performance"""
-        finished_predictions = self.get_finished_predictions()
+        # Same filter as get_finished_predictions, counted per points value in SQL
+        counts = Counter(dict(db.session.query(Prediction.points, db.func.count(Prediction.id))
+                              .join(Game, Prediction.game_id == Game.id)
+                              .filter(Prediction.user_id == self.id,
+                                      Game.is_finished == True,
+                                      Prediction.team1_score.isnot(None),
+                                      Prediction.points.isnot(None))
+                              .group_by(Prediction.points)
+                              .all()))
+        total_finished = sum(counts.values())
+        correct_predictions = sum(count for points, count in counts.items() if points >= 2)
         
         return {
-            'total_finished': len(finished_predictions),
-            'perfect_6pts': len([p for p in finished_predictions if p.points == 6]),
-            'winner_plus_score_4pts': len([p for p in finished_predictions if p.points == 4]),
-            'winner_only_2pts': len([p for p in finished_predictions if p.points == 2]),
-            'partial_1pt': len([p for p in finished_predictions if p.points == 1]),
-            'wrong_0pts': len([p for p in finished_predictions if p.points == 0]),
-            'correct_predictions': len([p for p in finished_predictions if p.points >= 2]),
-            'accuracy': round((len([p for p in finished_predictions if p.points >= 2]) / max(len(finished_predictions), 1)) * 100, 1)
+            'total_finished': total_finished,
+            'perfect_6pts': counts[6],
+            'winner_plus_score_4pts': counts[4],
+            'winner_only_2pts': counts[2],
+            'partial_1pt': counts[1],
+            'wrong_0pts': counts[0],
+            'correct_predictions': correct_predictions,
+            'accuracy': round((correct_predictions / max(total_finished, 1)) * 100, 1)
         }
 
 class Game(db.Model):
@@ -247,39 +447,74 @@ class Game(db.Model):
     result_source = db.Column(db.String(50), default='manual')  # 'manual', 'auto_serpapi'
     serpapi_search_used = db.Column(db.Boolean, default=False)
 
-    predictions = db.relationship('Prediction', backref='game', lazy=True, cascade='all, delete-orphan')
+    __table_args__ = (
+        # Finished-game lookups ordered by date (hashes, latest results, highlights)
+        db.Index('ix_game_finished_date', 'is_finished', 'game_date'),
+        # Date range filters on /predictions that do not constrain is_finished
+        db.Index('ix_game_date', 'game_date'),
+    )
+
+    # The database deletes a game's predictions (ON DELETE CASCADE); the ORM does not load them first
+    predictions = db.relationship('Prediction', back_populates='game', lazy=True,
+                                  cascade='all, delete-orphan', passive_deletes=True)
     
     def is_prediction_open(self):
-        current_time = get_riga_time()
-        deadline = to_riga_time(self.prediction_deadline)
-        return current_time < deadline
+        # Deadlines are naive Riga time, so compare wall-clock times without converting
+        return get_riga_now_naive() < self.prediction_deadline
     
     def are_predictions_visible(self):
-        current_time = get_riga_time()
-        deadline = to_riga_time(self.prediction_deadline)
-        return current_time >= deadline
+        return get_riga_now_naive() >= self.prediction_deadline
     
     def get_winner(self):
         if self.team1_score is not None and self.team2_score is not None:
             return self.team1 if self.team1_score > self.team2_score else self.team2
         return None
 
+@event.listens_for(Game, 'load')
+def _intern_team_names(target, context):
+    """Share one string object per team name across loaded games (see TEAM_COUNTRY_MAPPING)"""
+    for name in ('team1', 'team2'):
+        value = target.__dict__.get(name)
+        if value is not None:
+            set_committed_value(target, name, sys.intern(value))
+
 class Prediction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id', ondelete='CASCADE'), nullable=False)
     team1_score = db.Column(db.Integer, nullable=True)
     team2_score = db.Column(db.Integer, nullable=True)
     predicted_winner = db.Column(db.String(100), nullable=True)
     points = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    __table_args__ = (db.UniqueConstraint('user_id', 'game_id'),)
+
+    user = db.relationship('User', back_populates='predictions')
+    # Games are loaded in one IN query per batch of predictions instead of one query per row
+    game = db.relationship('Game', back_populates='predictions', lazy='selectin')
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'game_id'),
+        db.Index('ix_prediction_user_points', 'user_id', 'points'),
+        # Per-game lookups (all_predictions, match_detail, result updates); game_id is
+        # not the leading column of the unique (user_id, game_id) index
+        db.Index('ix_prediction_game_id', 'game_id'),
+        # Real (non-default) predictions per user, e.g. the "recent 5" form lookup
+        db.Index('ix_prediction_user_real', 'user_id', 'game_id',
+                 postgresql_where=db.text('team1_score IS NOT NULL'),
+                 sqlite_where=db.text('team1_score IS NOT NULL')),
+    )
     
     def is_default_prediction(self):
         """Check if this is a default prediction (created by recalculation system)"""
         return self.team1_score is None and self.team2_score is None and self.predicted_winner is None
 
+    @staticmethod
+    def is_real():
+        """SQL counterpart of `not is_default_prediction()` for use in query filters"""
+        return db.or_(Prediction.team1_score.isnot(None),
+                      Prediction.team2_score.isnot(None),
+                      Prediction.predicted_winner.isnot(None))
+
 class TournamentPrediction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -290,7 +525,7 @@ class TournamentPrediction(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    user = db.relationship('User', backref=db.backref('tournament_prediction', uselist=False))
+    user = db.relationship('User', back_populates='tournament_prediction')
     
     __table_args__ = (db.UniqueConstraint('user_id'),)
 
@@ -334,6 +569,11 @@ class PlayerMessage(db.Model):
     
     user = db.relationship('User', backref=db.backref('messages', lazy=True))
 
+    __table_args__ = (
+        # One stored message per user, replaced in place by _cache_message
+        db.Index('uq_player_message_user_id', 'user_id', unique=True),
+    )
+
 class DailyApiUsage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.Date, unique=True, nullable=False)
@@ -341,6 +581,10 @@ class DailyApiUsage(db.Model):
     daily_limit = db.Column(db.Integer, default=100)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+# Month -> SerpApiUsage row id, so the monthly row is fetched by primary key.
+# Counters are not cached: they enforce a quota shared by every worker.
+_usage_id_cache = {}
+
 class SerpApiUsage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     month_year = db.Column(db.String(7), unique=True, nullable=False)  # "2025-09"
@@ -352,12 +596,16 @@ class SerpApiUsage(db.Model):
     @staticmethod
     def get_current_month_usage():
         """Get current month's usage, create if doesn't exist"""
-        current_month = datetime.now().strftime('%Y-%m')
-        usage = SerpApiUsage.query.filter_by(month_year=current_month).first()
+        current_month = get_utc_now().strftime('%Y-%m')
+        usage_id = _usage_id_cache.get(current_month)
+        usage = db.session.get(SerpApiUsage, usage_id) if usage_id else None
+        if not usage:
+            usage = SerpApiUsage.query.filter_by(month_year=current_month).first()
         if not usage:
             usage = SerpApiUsage(month_year=current_month)
             db.session.add(usage)
             db.session.commit()
+        _usage_id_cache[current_month] = usage.id
         return usage
 
     def can_make_search(self):
@@ -402,6 +650,11 @@ class LoggingConfig(db.Model):
         numeric_level = getattr(logging, level.upper(), logging.INFO)
         logging.getLogger().setLevel(numeric_level)
 
+class SchemaMeta(db.Model):
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(100), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class TournamentConfig(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     prediction_deadline = db.Column(db.DateTime, nullable=False)
@@ -412,17 +665,46 @@ class TournamentConfig(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def is_prediction_open(self):
-        current_time = get_riga_time()
-        deadline = to_riga_time(self.prediction_deadline)
-        return current_time < deadline
+        return get_riga_now_naive() < self.prediction_deadline
     
     def are_results_available(self):
         return self.is_finalized and all([self.first_place_result, self.second_place_result, self.third_place_result])
 
 
+# ISO 8601 durations returned by the YouTube API, e.g. PT5M30S
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+def extract_youtube_video_id(youtube_url):
+    """Extract video ID from a youtube.com/watch or youtu.be URL, None if not recognised"""
+    if 'youtube.com/watch?v=' in youtube_url:
+        return youtube_url.split('youtube.com/watch?v=')[-1].split('&')[0]
+    elif 'youtu.be/' in youtube_url:
+        return youtube_url.split('youtu.be/')[-1].split('?')[0]
+    return None
+
+def format_video_duration(duration):
+    """Format duration for display"""
+    if not duration:
+        return "Unknown"
+    # Convert PT5M30S format to 5m 30s
+    if duration.startswith('PT'):
+        match = _DURATION_RE.match(duration)
+        if match:
+            hours, minutes, seconds = match.groups()
+            parts = []
+            if hours:
+                parts.append(f"{hours}h")
+            if minutes:
+                parts.append(f"{minutes}m")
+            if seconds:
+                parts.append(f"{seconds}s")
+            return " ".join(parts) if parts else "0s"
+    return duration
+
+
 class GameHighlight(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id', ondelete='CASCADE'), nullable=False)
     youtube_url = db.Column(db.String(500), nullable=False)
     youtube_video_id = db.Column(db.String(20), nullable=False)  # Extracted from URL
     title = db.Column(db.String(200), nullable=False)
@@ -439,45 +721,26 @@ class GameHighlight(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Per-game lookups: the highlights page and the "games without highlights" anti-join
+        db.Index('ix_game_highlight_game_id', 'game_id'),
+    )
+
     # Relationship
-    game = db.relationship('Game', backref=db.backref('highlights', lazy=True, cascade='all, delete-orphan'))
+    game = db.relationship('Game', backref=db.backref('highlights', lazy=True, cascade='all, delete-orphan',
+                                                      passive_deletes=True))
 
     def get_embed_url(self):
-        """Convert YouTube URL to embeddable format"""
-        if 'youtube.com/watch?v=' in self.youtube_url:
-            return self.youtube_url.replace('youtube.com/watch?v=', 'youtube.com/embed/')
-        elif 'youtu.be/' in self.youtube_url:
-            video_id = self.youtube_url.split('youtu.be/')[-1].split('?')[0]
-            return f'https://www.youtube.com/embed/{video_id}'
-        return self.youtube_url
+        """Embeddable YouTube URL built from the video ID stored at write time"""
+        return f'https://www.youtube.com/embed/{self.youtube_video_id}'
 
     def get_video_id(self):
-        """Extract video ID from YouTube URL"""
-        if 'youtube.com/watch?v=' in self.youtube_url:
-            return self.youtube_url.split('youtube.com/watch?v=')[-1].split('&')[0]
-        elif 'youtu.be/' in self.youtube_url:
-            return self.youtube_url.split('youtu.be/')[-1].split('?')[0]
+        """YouTube video ID (extracted from the URL when the row was saved)"""
         return self.youtube_video_id
 
     def format_duration(self):
         """Format duration for display"""
-        if not self.duration:
-            return "Unknown"
-        # Convert PT5M30S format to 5:30
-        if self.duration.startswith('PT'):
-            import re
-            match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', self.duration)
-            if match:
-                hours, minutes, seconds = match.groups()
-                parts = []
-                if hours:
-                    parts.append(f"{hours}h")
-                if minutes:
-                    parts.append(f"{minutes}m")
-                if seconds:
-                    parts.append(f"{seconds}s")
-                return " ".join(parts) if parts else "0s"
-        return self.duration
+        return format_video_duration(self.duration)
 
 
 class FeaturedVideo(db.Model):
@@ -498,110 +761,215 @@ class FeaturedVideo(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def get_embed_url(self):
-        """Convert YouTube URL to embeddable format"""
-        if 'youtube.com/watch?v=' in self.youtube_url:
-            return self.youtube_url.replace('youtube.com/watch?v=', 'youtube.com/embed/')
-        elif 'youtu.be/' in self.youtube_url:
-            video_id = self.youtube_url.split('youtu.be/')[-1].split('?')[0]
-            return f'https://www.youtube.com/embed/{video_id}'
-        return self.youtube_url
+        """Embeddable YouTube URL built from the video ID stored at write time"""
+        return f'https://www.youtube.com/embed/{self.youtube_video_id}'
 
     def get_video_id(self):
-        """Extract video ID from YouTube URL"""
-        if 'youtube.com/watch?v=' in self.youtube_url:
-            return self.youtube_url.split('youtube.com/watch?v=')[-1].split('&')[0]
-        elif 'youtu.be/' in self.youtube_url:
-            return self.youtube_url.split('youtu.be/')[-1].split('?')[0]
+        """YouTube video ID (extracted from the URL when the row was saved)"""
         return self.youtube_video_id
 
     def format_duration(self):
         """Format duration for display"""
-        if not self.duration:
-            return "Unknown"
-        # Convert PT5M30S format to 5:30
-        if self.duration.startswith('PT'):
-            import re
-            match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', self.duration)
-            if match:
-                hours, minutes, seconds = match.groups()
-                parts = []
-                if hours:
-                    parts.append(f"{hours}h")
-                if minutes:
-                    parts.append(f"{minutes}m")
-                if seconds:
-                    parts.append(f"{seconds}s")
-                return " ".join(parts) if parts else "0s"
-        return self.duration
+        return format_video_duration(self.duration)
 
 
 # Performance Analysis Functions
+USER_HASH_CACHE_TTL_SECONDS = 30
+_user_hash_cache = {}
+
+def cache_user_hash(func):
+    """Cache a per-user hash for a short TTL; entries are dropped when the user's data is flushed"""
+    @wraps(func)
+    def wrapper(user_id):
+        key = (func.__name__, user_id)
+        now = time.monotonic()
+        entry = _user_hash_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        value = func(user_id)
+        if value is not None:
+            _user_hash_cache[key] = (now + USER_HASH_CACHE_TTL_SECONDS, value)
+        return value
+    return wrapper
+
+def invalidate_user_hashes(user_id=None):
+    """Drop cached hashes for one user, or for everyone when user_id is None"""
+    if user_id is None:
+        _user_hash_cache.clear()
+        _user_message_poll_cache.clear()
+        return
+    for key in [key for key in _user_hash_cache if key[1] == user_id]:
+        _user_hash_cache.pop(key, None)
+    _user_message_poll_cache.pop(user_id, None)
+
+@event.listens_for(SessionBase, 'after_flush')
+def _invalidate_hashes_after_flush(db_session, flush_context):
+    """Game results affect every user's hashes; predictions only their owner's"""
+    for obj in list(db_session.new) + list(db_session.dirty) + list(db_session.deleted):
+        if isinstance(obj, Game):
+            invalidate_user_hashes()
+            return
+        if isinstance(obj, (Prediction, TournamentPrediction)):
+            invalidate_user_hashes(obj.user_id)
+
+# Marker in session.info['stale_score_users'] meaning every user's stored stats need a refresh
+ALL_USERS = object()
+
+@event.listens_for(SessionBase, 'after_flush')
+def _track_stale_score_users(db_session, flush_context):
+    """Remember which users' denormalized score columns are affected by this flush"""
+    stale = db_session.info.setdefault('stale_score_users', set())
+    for obj in list(db_session.new) + list(db_session.dirty) + list(db_session.deleted):
+        if isinstance(obj, Game):
+            state = db.inspect(obj)
+            if obj in db_session.deleted or any(
+                    state.attrs[name].history.has_changes()
+                    for name in ('is_finished', 'team1_score', 'team2_score')):
+                stale.add(ALL_USERS)
+        elif isinstance(obj, (Prediction, TournamentPrediction)):
+            stale.add(obj.user_id)
+    if not stale:
+        db_session.info.pop('stale_score_users')
+
+def mark_scores_stale(user_ids=None):
+    """Flag stored stats and hashes as stale after bulk writes that bypass the ORM flush"""
+    stale = db.session.info.setdefault('stale_score_users', set())
+    if user_ids is None:
+        stale.add(ALL_USERS)
+        invalidate_user_hashes()
+        return
+    stale.update(user_ids)
+    for user_id in user_ids:
+        invalidate_user_hashes(user_id)
+
+@event.listens_for(SessionBase, 'before_commit')
+def _refresh_stale_score_users(db_session):
+    """Write the denormalized score columns in the same transaction as the change"""
+    if 'stale_score_users' not in db_session.info and not (db_session.new or db_session.dirty or db_session.deleted):
+        return
+    db_session.flush()
+    stale = db_session.info.pop('stale_score_users', None)
+    if stale:
+        User.refresh_stored_stats(None if ALL_USERS in stale else list(stale), db_session)
+        invalidate_ranking_snapshot()
+
+@event.listens_for(SessionBase, 'after_rollback')
+def _discard_stale_score_users(db_session):
+    db_session.info.pop('stale_score_users', None)
+
+RANKING_SNAPSHOT_TTL_SECONDS = 60
+_ranking_generation = 0
+
+@lru_cache(maxsize=1)
+def _compute_ranking_snapshot(bucket, generation):
+    """Rank every user by stored total score; cached per time bucket and data generation"""
+    # Not-yet-stored (NULL) totals count as 0 instead of sorting first on PostgreSQL
+    stored_score = db.func.coalesce(User.total_score, 0)
+    user_scores = db.session.query(stored_score, User.id).order_by(
+        stored_score.desc(), User.id.desc()
+    ).all()
+    total_players = len(user_scores)
+    ranks = {uid: i + 1 for i, (score, uid) in enumerate(user_scores)}
+    tiers = {uid: rank_tier(rank, total_players) for uid, rank in ranks.items()}
+    return ranks, tiers, total_players
+
+def rank_tier(rank, total_players):
+    """Bucket a leaderboard position: 'elite' (top 3), 'upper' half or 'lower' half"""
+    if rank <= 3:
+        return 'elite'
+    if rank * 2 <= total_players:
+        return 'upper'
+    return 'lower'
+
+def get_ranking_snapshot():
+    """Return ({user_id: rank}, {user_id: tier}, total_players), recomputed at most once a minute"""
+    return _compute_ranking_snapshot(int(time.time() // RANKING_SNAPSHOT_TTL_SECONDS), _ranking_generation)
+
+def invalidate_ranking_snapshot():
+    """Force the next get_ranking_snapshot() call to re-query"""
+    global _ranking_generation
+    _ranking_generation += 1
+
+def get_real_prediction_counts(user_id):
+    """Count a user's real (non-default) predictions and those worth 2+ points"""
+    total, correct = db.session.query(
+        db.func.count(Prediction.id),
+        db.func.coalesce(db.func.sum(db.case((Prediction.points >= 2, 1), else_=0)), 0)
+    ).filter(
+        Prediction.user_id == user_id,
+        Prediction.is_real()
+    ).one()
+    return total, correct
+
+@cache_user_hash
 def calculate_performance_hash(user_id):
     """Calculate a hash based on user's current performance metrics"""
     try:
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return None
         
-        # Get recent performance data (last 7 days of finished games)
-        recent_cutoff = datetime.utcnow() - timedelta(days=7)
-        recent_predictions = db.session.query(Prediction).join(Game).filter(
-            Prediction.user_id == user_id,
-            Game.is_finished == True,
-            Game.game_date >= recent_cutoff,
-            Prediction.team1_score.isnot(None)  # Only real predictions
-        ).all()
+        # Overall real-prediction counts and the last 7 days of finished games, in one pass
+        recent_cutoff = get_utc_now() - timedelta(days=7)
+        real = Prediction.is_real()
+        recent = db.and_(Game.is_finished == True,
+                         Game.game_date >= recent_cutoff,
+                         Prediction.team1_score.isnot(None))  # Only real predictions
+        (total_predictions, correct_predictions,
+         recent_total, recent_correct, recent_points) = db.session.query(
+            db.func.coalesce(db.func.sum(db.case((real, 1), else_=0)), 0),
+            db.func.coalesce(db.func.sum(db.case((db.and_(real, Prediction.points >= 2), 1), else_=0)), 0),
+            db.func.coalesce(db.func.sum(db.case((recent, 1), else_=0)), 0),
+            db.func.coalesce(db.func.sum(db.case((db.and_(recent, Prediction.points >= 2), 1), else_=0)), 0),
+            db.func.coalesce(db.func.sum(db.case((recent, Prediction.points), else_=0)), 0)
+        ).join(Game, Prediction.game_id == Game.id).filter(
+            Prediction.user_id == user_id
+        ).one()
         
         # Calculate metrics
         total_score = user.get_total_score()
-        total_predictions = len([p for p in user.predictions if not p.is_default_prediction()])
-        correct_predictions = len([p for p in user.predictions if p.points and p.points >= 2 and not p.is_default_prediction()])
         accuracy = round((correct_predictions / total_predictions * 100) if total_predictions > 0 else 0)
         
         # Recent performance
-        recent_correct = len([p for p in recent_predictions if p.points and p.points >= 2])
-        recent_total = len(recent_predictions)
         recent_accuracy = round((recent_correct / recent_total * 100) if recent_total > 0 else 0)
-        recent_points = sum([p.points or 0 for p in recent_predictions])
         
         # Create hash string
-        hash_data = f"{total_score}_{total_predictions}_{accuracy}_{recent_accuracy}_{recent_points}_{recent_total}"
-        return hashlib.md5(hash_data.encode()).hexdigest()
+        hash_data = b'_'.join(str(x).encode() for x in (
+            total_score, total_predictions, accuracy, recent_accuracy, recent_points, recent_total
+        ))
+        return hashlib.blake2b(hash_data, digest_size=16).hexdigest()
         
     except Exception as e:
         logging.error(f"Error calculating performance hash for user {user_id}: {str(e)}")
         db.session.rollback()
         return None
 
+@cache_user_hash
 def calculate_latest_results_hash(user_id):
     """Calculate hash based on latest game results user hasn't seen"""
     try:
-        # Get latest finished games (recent games that have results)
-        latest_games = Game.query.filter(
+        # Latest finished games with this user's prediction (if any), in one query
+        latest = db.session.query(
+            Game.id, Game.team1_score, Game.team2_score,
+            Prediction.id, Prediction.team1_score, Prediction.team2_score, Prediction.points
+        ).outerjoin(
+            Prediction, db.and_(Prediction.game_id == Game.id, Prediction.user_id == user_id)
+        ).filter(
             Game.is_finished == True,
             Game.team1_score.isnot(None),
             Game.team2_score.isnot(None)
         ).order_by(Game.game_date.desc()).limit(5).all()
         
-        # Include user's predictions for these games
-        user_predictions = {}
-        if latest_games:
-            game_ids = [g.id for g in latest_games]
-            predictions = Prediction.query.filter(
-                Prediction.user_id == user_id,
-                Prediction.game_id.in_(game_ids)
-            ).all()
-            user_predictions = {p.game_id: p for p in predictions}
-        
         # Create hash from game results and user predictions
-        hash_data = ""
-        for game in latest_games:
-            pred = user_predictions.get(game.id)
-            pred_info = f"{pred.team1_score}-{pred.team2_score}" if pred and pred.team1_score is not None else "none"
-            points = pred.points if pred else 0
-            hash_data += f"{game.id}_{game.team1_score}_{game.team2_score}_{pred_info}_{points}_"
+        hash_parts = []
+        for game_id, team1_score, team2_score, pred_id, pred_team1, pred_team2, pred_points in latest:
+            pred_info = f"{pred_team1}-{pred_team2}" if pred_id is not None and pred_team1 is not None else "none"
+            points = pred_points if pred_id is not None else 0
+            hash_parts.append(f"{game_id}_{team1_score}_{team2_score}_{pred_info}_{points}_")
         
-        return hashlib.md5(hash_data.encode()).hexdigest() if hash_data else None
+        if not hash_parts:
+            return None
+        return hashlib.blake2b(''.join(hash_parts).encode(), digest_size=16).hexdigest()
         
     except Exception as e:
         logging.error(f"Error calculating latest results hash for user {user_id}: {str(e)}")
@@ -611,83 +979,50 @@ def calculate_latest_results_hash(user_id):
 def get_latest_results_summary(user_id):
     """Get detailed summary of latest results user participated in"""
     try:
-        # First try to get games from last 24 hours
-        recent_cutoff = datetime.utcnow() - timedelta(hours=24)
-        recent_games = db.session.query(Game).join(Prediction).filter(
+        # The three most recent finished games the user predicted, with their predictions
+        latest = db.session.query(Game, Prediction).join(
+            Prediction, db.and_(Prediction.game_id == Game.id, Prediction.user_id == user_id)
+        ).filter(
             Game.is_finished == True,
             Game.team1_score.isnot(None),
-            Game.team2_score.isnot(None),
-            Game.game_date >= recent_cutoff,
-            Prediction.user_id == user_id
+            Game.team2_score.isnot(None)
         ).order_by(Game.game_date.desc()).limit(3).all()
-        
-        # If we have recent games, use them
-        if recent_games:
-            results = []
-            for game in recent_games:
-                prediction = Prediction.query.filter_by(user_id=user_id, game_id=game.id).first()
-                if prediction:
-                    correct = prediction.points and prediction.points >= 2
-                    results.append({
-                        'game': game,
-                        'prediction': prediction,
-                        'correct': correct,
-                        'points': prediction.points or 0,
-                        'is_recent': True
-                    })
-            return results
-        
-        # Otherwise get the most recent completed games (up to last 7 days)
-        week_cutoff = datetime.utcnow() - timedelta(days=7)
-        latest_games = db.session.query(Game).join(Prediction).filter(
-            Game.is_finished == True,
-            Game.team1_score.isnot(None),
-            Game.team2_score.isnot(None),
-            Game.game_date >= week_cutoff,
-            Prediction.user_id == user_id
-        ).order_by(Game.game_date.desc()).limit(2).all()
-        
-        if not latest_games:
-            # Last resort - get any completed game
-            last_game = db.session.query(Game).join(Prediction).filter(
-                Game.is_finished == True,
-                Game.team1_score.isnot(None),
-                Game.team2_score.isnot(None),
-                Prediction.user_id == user_id
-            ).order_by(Game.game_date.desc()).first()
-            
-            if last_game:
-                prediction = Prediction.query.filter_by(user_id=user_id, game_id=last_game.id).first()
-                if prediction:
-                    return [{
-                        'game': last_game,
-                        'prediction': prediction,
-                        'correct': prediction.points and prediction.points >= 2,
-                        'points': prediction.points or 0,
-                        'is_latest': True
-                    }]
+
+        if not latest:
             return None
-        
-        results = []
-        for game in latest_games:
-            prediction = Prediction.query.filter_by(user_id=user_id, game_id=game.id).first()
-            if prediction:
-                correct = prediction.points and prediction.points >= 2
-                results.append({
-                    'game': game,
-                    'prediction': prediction,
-                    'correct': correct,
-                    'points': prediction.points or 0,
-                    'is_recent': False
-                })
-        
-        return results
-        
+
+        def summarize(game, prediction, **flags):
+            return {
+                'game': game,
+                'prediction': prediction,
+                'correct': prediction.points and prediction.points >= 2,
+                'points': prediction.points or 0,
+                **flags
+            }
+
+        # Prefer games from the last 24 hours
+        recent_cutoff = get_utc_now() - timedelta(hours=24)
+        recent = [(game, prediction) for game, prediction in latest if game.game_date >= recent_cutoff]
+        if recent:
+            return [summarize(game, prediction, is_recent=True) for game, prediction in recent]
+
+        # Otherwise the most recent completed games (up to last 7 days)
+        week_cutoff = get_utc_now() - timedelta(days=7)
+        this_week = [(game, prediction) for game, prediction in latest[:2] if game.game_date >= week_cutoff]
+        if this_week:
+            return [summarize(game, prediction, is_recent=False) for game, prediction in this_week]
+
+        # Last resort - the latest completed game
+        game, prediction = latest[0]
+        return [summarize(game, prediction, is_latest=True)]
+
     except Exception as e:
         logging.error(f"Error getting latest results summary for user {user_id}: {str(e)}")
         db.session.rollback()
         return None
 
+RANK_TIER_LABELS = {'elite': 'Elite position', 'upper': 'Upper half', 'lower': 'Room to climb'}
+
 def get_detailed_context_for_ai(user_id):
     """Get very detailed context for AI message generation"""
     analysis = analyze_user_performance(user_id)
@@ -711,12 +1046,8 @@ def get_detailed_context_for_ai(user_id):
         context['specific_details'].append(f"Rough patch: Recent {analysis['recent_accuracy']}% vs overall {analysis['accuracy']}%")
     
     # Add ranking context
-    if analysis['rank'] <= 3:
-        context['specific_details'].append(f"Elite position: #{analysis['rank']} out of {analysis['total_players']} players")
-    elif analysis['rank'] <= analysis['total_players'] // 2:
-        context['specific_details'].append(f"Upper half: #{analysis['rank']} out of {analysis['total_players']} players")
-    else:
-        context['specific_details'].append(f"Room to climb: #{analysis['rank']} out of {analysis['total_players']} players")
+    tier_label = RANK_TIER_LABELS[analysis['rank_tier']]
+    context['specific_details'].append(f"{tier_label}: #{analysis['rank']} out of {analysis['total_players']} players")
     
     # Add latest game details if available
     if latest_results:
@@ -742,27 +1073,27 @@ def analyze_user_performance(user_id):
     if not user:
         return None
     
-    # Get all users for ranking comparison
-    all_users = User.query.all()
-    user_scores = [(u.get_total_score(), u.id) for u in all_users]
-    user_scores.sort(reverse=True)
-    user_rank = next((i + 1 for i, (score, uid) in enumerate(user_scores) if uid == user_id), len(user_scores))
+    # Rank comes from the shared snapshot rather than a per-call query
+    ranks, tiers, total_players = get_ranking_snapshot()
+    user_rank = ranks.get(user_id, total_players)
+    user_tier = tiers.get(user_id) or rank_tier(user_rank, total_players)
     
     # Calculate metrics
     total_score = user.get_total_score()
-    total_predictions = len([p for p in user.predictions if not p.is_default_prediction()])
-    correct_predictions = len([p for p in user.predictions if p.points and p.points >= 2 and not p.is_default_prediction()])
+    total_predictions, correct_predictions = get_real_prediction_counts(user_id)
     accuracy = round((correct_predictions / total_predictions * 100) if total_predictions > 0 else 0)
     
     # Recent performance (last 5 games)
-    recent_predictions = db.session.query(Prediction).join(Game).filter(
-        Prediction.user_id == user_id,
-        Game.is_finished == True,
-        Prediction.team1_score.isnot(None)  # Only real predictions
-    ).order_by(Game.game_date.desc()).limit(5).all()
+    recent_points = db.session.scalars(
+        db.select(Prediction.points).join(Game, Prediction.game_id == Game.id).where(
+            Prediction.user_id == user_id,
+            Game.is_finished == True,
+            Prediction.team1_score.isnot(None)  # Only real predictions
+        ).order_by(Game.game_date.desc()).limit(5)
+    ).all()
     
-    recent_correct = len([p for p in recent_predictions if p.points and p.points >= 2])
-    recent_total = len(recent_predictions)
+    recent_correct = sum(1 for points in recent_points if points and points >= 2)
+    recent_total = len(recent_points)
     recent_accuracy = round((recent_correct / recent_total * 100) if recent_total > 0 else 0)
     
     # Determine performance category
@@ -787,7 +1118,8 @@ def analyze_user_performance(user_id):
         'category': category,
         'total_score': total_score,
         'rank': user_rank,
-        'total_players': len(all_users),
+        'rank_tier': user_tier,
+        'total_players': total_players,
         'accuracy': accuracy,
         'recent_accuracy': recent_accuracy,
         'total_predictions': total_predictions,
@@ -796,6 +1128,61 @@ def analyze_user_performance(user_id):
         'recent_correct': recent_correct
     }
 
+_gemini_model = None
+
+def get_gemini_model():
+    """Configure Gemini once per process and reuse the model (and its HTTP client) across calls"""
+    global _gemini_model
+    if _gemini_model is None:
+        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+        _gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+    return _gemini_model
+
+# Placeholders available to fallback message templates
+FALLBACK_TEMPLATE_FIELDS = frozenset({
+    'name', 'total_score', 'rank', 'total_players', 'accuracy', 'recent_accuracy',
+    'correct_predictions', 'total_predictions', 'recent_total', 'latest_game', 'latest_points'
+})
+
+def check_template_fields(template):
+    """Raise ValueError if a message template uses a placeholder we never provide"""
+    for _, field_name, _, _ in string.Formatter().parse(template):
+        if field_name is not None and field_name not in FALLBACK_TEMPLATE_FIELDS:
+            raise ValueError(f"Unknown placeholder {{{field_name}}} in message template: {template}")
+    return template
+
+# In-process copy of the last reusable message per user: {user_id: (signature, valid_until, message_data)}
+PLAYER_MESSAGE_CACHE_MAX_ENTRIES = 10000
+FALLBACK_MESSAGE_TTL_SECONDS = 900
+_player_message_cache = {}
+
+def get_message_signature(user_id):
+    """Cheap one-row fingerprint of everything a player message depends on"""
+    finished = Game.is_finished == True
+    return tuple(db.session.query(
+        db.select(db.func.max(Game.id)).where(finished).scalar_subquery(),
+        db.select(db.func.count(Game.id)).where(finished).scalar_subquery(),
+        db.select(db.func.count(Prediction.id)).where(Prediction.user_id == user_id).scalar_subquery(),
+        db.select(User.total_score).where(User.id == user_id).scalar_subquery()
+    ).one())
+
+def remember_player_message(user_id, signature, valid_until, message_data):
+    """Store a message for reuse while the signature matches, and return a copy"""
+    if len(_player_message_cache) >= PLAYER_MESSAGE_CACHE_MAX_ENTRIES:
+        _player_message_cache.clear()
+    _player_message_cache[user_id] = (signature, valid_until, message_data)
+    return dict(message_data)
+
+def invalidate_player_messages(user_id):
+    """Drop the in-process cached message for a user whose stored message was replaced"""
+    _player_message_cache.pop(user_id, None)
+    _user_message_poll_cache.pop(user_id, None)
+
+# Responses of /api/user_message per user, so repeated polls skip the signature query
+# and the viewed-at write: {user_id: (expires_at_monotonic, message_data)}
+USER_MESSAGE_POLL_TTL_SECONDS = 60
+_user_message_poll_cache = {}
+
 class AIMessageGenerator:
     """Generate AI-powered inspirational messages for players"""
     
@@ -846,10 +1233,35 @@ class AIMessageGenerator:
                 "🚀 New player energy! Jump in and start climbing the leaderboard. Your prediction adventure starts now!"
             ]
         }
+        
+        # Used instead of the category templates when the latest result was a correct call
+        self.specific_positive_templates = {
+            'champion': "🏆 {latest_game} keeps you at #{rank}! {accuracy}% accuracy dominates with {total_score} points. Unstoppable!",
+            'top_performer': "🥇 {latest_game} for {latest_points}pts! Rank #{rank} with {accuracy}% accuracy. Top tier performance!",
+            'accuracy_master': "🎯 {latest_game} showcases your {accuracy}% precision! {correct_predictions} correct predictions prove your skills!",
+            'solid_predictor': "👍 {latest_game} adds to your {total_score} points! {accuracy}% accuracy shows consistent improvement!",
+            'improving': "📈 {latest_game} boosts recent {recent_accuracy}% vs {accuracy}% overall! Momentum building perfectly!",
+            'struggling': "💪 {latest_game} for {latest_points}pts breaks the slide! Your dedication shows - keep pushing forward!",
+            'average': "⚡ {latest_game} earns {latest_points}pts! Rank #{rank} with room to climb higher. Keep predicting!",
+            'newcomer': "🎉 {latest_game} in early games! Great start building your prediction skills. Promising beginning!"
+        }
+        
+        # Parse every template once so a bad placeholder fails at startup, not per render
+        for templates in self.fallback_templates.values():
+            for template in templates:
+                check_template_fields(template)
+        for template in self.specific_positive_templates.values():
+            check_template_fields(template)
     
     def get_or_create_message(self, user_id):
         """Get cached message or generate new one for user"""
         try:
+            # A cheap signature first: if it still matches, skip the hashes and context building
+            signature = get_message_signature(user_id)
+            entry = _player_message_cache.get(user_id)
+            if entry and entry[0] == signature and entry[1] > get_utc_now():
+                return dict(entry[2])
+            
             # Calculate current performance and results hashes
             perf_hash = calculate_performance_hash(user_id)
             results_hash = calculate_latest_results_hash(user_id)
@@ -860,7 +1272,7 @@ class AIMessageGenerator:
             # Check for existing cached message
             cached_message = PlayerMessage.query.filter_by(
                 user_id=user_id
-            ).filter(PlayerMessage.expires_at > datetime.utcnow()).first()
+            ).filter(PlayerMessage.expires_at > get_utc_now()).first()
             
             # Check if we need new message due to new results or performance change
             need_new_message = (
@@ -868,20 +1280,23 @@ class AIMessageGenerator:
                 cached_message.performance_hash != perf_hash or
                 (results_hash and cached_message.latest_results_hash != results_hash) or
                 not cached_message.last_viewed_at or
-                (datetime.utcnow() - cached_message.created_at).total_seconds() > 3600  # 1 hour
+                (get_utc_now() - cached_message.created_at).total_seconds() > 3600  # 1 hour
             )
             
             if cached_message and not need_new_message:
-                return {
+                message_data = {
                     'text': cached_message.message_text,
                     'category': cached_message.message_category,
                     'cached': True,
                     'message_id': cached_message.id
                 }
+                # Reusable until the one-hour refresh or the row's expiry, whichever comes first
+                valid_until = min(cached_message.created_at + timedelta(hours=1), cached_message.expires_at)
+                return remember_player_message(user_id, signature, valid_until, message_data)
             
             # Check daily API limits
             if not self._can_make_api_call():
-                return self._get_fallback_message(user_id)
+                return self._remember_fallback_message(user_id, signature)
             
             # Generate new message
             if GEMINI_AVAILABLE:
@@ -896,7 +1311,7 @@ class AIMessageGenerator:
                     db.session.rollback()  # Rollback any failed transaction
             
             # Fallback to template
-            return self._get_fallback_message(user_id)
+            return self._remember_fallback_message(user_id, signature)
             
         except Exception as e:
             logging.error(f"Database error in get_or_create_message for user {user_id}: {str(e)}")
@@ -904,15 +1319,21 @@ class AIMessageGenerator:
             # Return a safe fallback message
             return {'text': '🎯 Ready for your next prediction!', 'category': 'general', 'cached': False}
     
+    def _remember_fallback_message(self, user_id, signature):
+        """Build a template message and reuse it while the user's signature is unchanged"""
+        message_data = self._get_fallback_message(user_id)
+        valid_until = get_utc_now() + timedelta(seconds=FALLBACK_MESSAGE_TTL_SECONDS)
+        return remember_player_message(user_id, signature, valid_until, message_data)
+    
     def mark_message_viewed(self, user_id):
         """Mark the current message as viewed by the user"""
         try:
             cached_message = PlayerMessage.query.filter_by(
                 user_id=user_id
-            ).filter(PlayerMessage.expires_at > datetime.utcnow()).first()
+            ).filter(PlayerMessage.expires_at > get_utc_now()).first()
             
             if cached_message:
-                cached_message.last_viewed_at = datetime.utcnow()
+                cached_message.last_viewed_at = get_utc_now()
                 db.session.commit()
         except Exception as e:
             logging.error(f"Error marking message viewed for user {user_id}: {str(e)}")
@@ -921,16 +1342,11 @@ class AIMessageGenerator:
     def _can_make_api_call(self):
         """Check if we can make another API call today"""
         try:
-            today = datetime.utcnow().date()
-            usage = DailyApiUsage.query.filter_by(date=today).first()
-            
-            if not usage:
-                # Create new usage record
-                usage = DailyApiUsage(date=today, calls_made=0)
-                db.session.add(usage)
-                db.session.commit()
-            
-            return usage.calls_made < self.daily_limit
+            calls_made = db.session.scalar(
+                db.select(DailyApiUsage.calls_made).where(DailyApiUsage.date == get_utc_now().date())
+            )
+            # No row yet means no calls today; _increment_api_usage creates it
+            return (calls_made or 0) < self.daily_limit
         except Exception as e:
             logging.error(f"Error checking API usage: {str(e)}")
             db.session.rollback()
@@ -940,15 +1356,15 @@ class AIMessageGenerator:
     def _increment_api_usage(self):
         """Increment daily API usage counter"""
         try:
-            today = datetime.utcnow().date()
-            usage = DailyApiUsage.query.filter_by(date=today).first()
-            
-            if not usage:
-                usage = DailyApiUsage(date=today, calls_made=1)
-                db.session.add(usage)
-            else:
-                usage.calls_made += 1
-            
+            # Single atomic upsert: no lost updates when workers count concurrently
+            stmt = dialect_insert(DailyApiUsage).values(
+                date=get_utc_now().date(), calls_made=1, daily_limit=self.daily_limit, created_at=get_utc_now()
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DailyApiUsage.date],
+                set_={'calls_made': DailyApiUsage.calls_made + 1}
+            )
+            db.session.execute(stmt)
             db.session.commit()
         except Exception as e:
             logging.error(f"Error incrementing API usage: {str(e)}")
@@ -1010,14 +1426,8 @@ Requirements:
 Generate the message now:"""
 
         try:
-            # Configure Gemini API
-            genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-            
-            # Create model
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            # Generate content
-            response = model.generate_content(prompt)
+            # Generate content with the shared, already configured model
+            response = get_gemini_model().generate_content(prompt)
             
             message_text = response.text.strip().replace('"', '').replace("'", '')
             
@@ -1084,28 +1494,14 @@ Generate the message now:"""
         # Select template based on context
         if latest_results and latest_results[0]['correct']:
             # Positive recent result templates
-            specific_templates = {
-                'champion': "🏆 {latest_game} keeps you at #{rank}! {accuracy}% accuracy dominates with {total_score} points. Unstoppable!",
-                'top_performer': "🥇 {latest_game} for {latest_points}pts! Rank #{rank} with {accuracy}% accuracy. Top tier performance!",
-                'accuracy_master': "🎯 {latest_game} showcases your {accuracy}% precision! {correct_predictions} correct predictions prove your skills!",
-                'solid_predictor': "👍 {latest_game} adds to your {total_score} points! {accuracy}% accuracy shows consistent improvement!",
-                'improving': "📈 {latest_game} boosts recent {recent_accuracy}% vs {accuracy}% overall! Momentum building perfectly!",
-                'struggling': "💪 {latest_game} for {latest_points}pts breaks the slide! Your dedication shows - keep pushing forward!",
-                'average': "⚡ {latest_game} earns {latest_points}pts! Rank #{rank} with room to climb higher. Keep predicting!",
-                'newcomer': "🎉 {latest_game} in early games! Great start building your prediction skills. Promising beginning!"
-            }
-            template = specific_templates.get(category, templates[0])
+            template = self.specific_positive_templates.get(category, templates[0])
         else:
-            # Use regular templates
-            template = random.choice(templates)
+            # Use regular templates; seeded by the stats so an unchanged user keeps the same message
+            seed = f"{user.id}:{analysis['total_score']}:{analysis['total_predictions']}:{category}"
+            template = random.Random(seed).choice(templates)
         
-        # Format with specific data
-        try:
-            message = template.format(**format_data)
-        except KeyError:
-            # Fallback if formatting fails
-            template = random.choice(templates)
-            message = template.format(**format_data)
+        # Format with specific data (placeholders were validated in __init__)
+        message = template.format_map(format_data)
         
         return {
             'text': message,
@@ -1116,28 +1512,34 @@ Generate the message now:"""
     def _cache_message(self, user_id, message_data, perf_hash, results_hash=None):
         """Cache generated message in database"""
         try:
-            expires_at = datetime.utcnow() + timedelta(hours=self.cache_duration_hours)
-            
-            # Remove old messages for this user
-            PlayerMessage.query.filter_by(user_id=user_id).delete()
-            
-            # Create new cached message
-            cached_message = PlayerMessage(
-                user_id=user_id,
-                message_text=message_data['text'],
-                message_category=message_data['category'],
-                performance_hash=perf_hash,
-                latest_results_hash=results_hash,
-                expires_at=expires_at,
-                api_calls_used=1 if not message_data.get('cached', False) else 0
-            )
+            expires_at = get_utc_now() + timedelta(hours=self.cache_duration_hours)
             
-            db.session.add(cached_message)
+            # Replace the user's stored message in place (one row per user)
+            values = {
+                'message_text': message_data['text'],
+                'message_category': message_data['category'],
+                'performance_hash': perf_hash,
+                'latest_results_hash': results_hash,
+                'created_at': get_utc_now(),
+                'expires_at': expires_at,
+                'api_calls_used': 1 if not message_data.get('cached', False) else 0,
+                'last_viewed_at': None
+            }
+            stmt = dialect_insert(PlayerMessage).values(user_id=user_id, **values)
+            stmt = stmt.on_conflict_do_update(index_elements=[PlayerMessage.user_id], set_=values)
+            db.session.execute(stmt)
             db.session.commit()
+            invalidate_player_messages(user_id)
         except Exception as e:
             logging.error(f"Error caching message for user {user_id}: {str(e)}")
             db.session.rollback()
 
+# Stateless apart from its templates, so one instance serves every request
+ai_message_generator = AIMessageGenerator()
+
+# Checked for unknown emails on login so response time does not reveal registered accounts
+INVALID_USER_PASSWORD_HASH = generate_password_hash(os.urandom(32).hex())
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -1161,28 +1563,71 @@ def check_password_reset():
         request.endpoint not in exempt_routes):
         return redirect(url_for('change_password'))
 
+# Other workers and scripts also write games and teams, so the per-process lists below are keyed
+# by a time bucket like the ranking snapshot; local writes clear them immediately
+TEAM_LIST_CACHE_TTL_SECONDS = 60
+
+def team_list_cache_bucket():
+    return int(time.time() // TEAM_LIST_CACHE_TTL_SECONDS)
+
+@lru_cache(maxsize=1)
+def _game_team_names(bucket):
+    team_names = db.select(Game.team1.label('name')).union(db.select(Game.team2)).subquery()
+    return tuple(db.session.scalars(db.select(team_names.c.name).order_by(team_names.c.name)))
+
+def get_game_team_names():
+    """Sorted distinct team names from all games, recomputed at most once a minute"""
+    return _game_team_names(team_list_cache_bucket())
+
+@lru_cache(maxsize=1)
+def _tournament_team_names(bucket):
+    return tuple(db.session.scalars(db.select(TournamentTeam.name).order_by(TournamentTeam.name)))
+
+def get_tournament_team_names():
+    """Sorted tournament team names, cached like get_game_team_names"""
+    return _tournament_team_names(team_list_cache_bucket())
+
+@lru_cache(maxsize=1)
+def _game_filter_options(bucket):
+    game_day = db.func.date(Game.game_date, type_=db.Date)
+    dates = db.session.scalars(db.select(game_day).distinct().order_by(game_day))
+    rounds = db.session.scalars(db.select(Game.round_name).distinct().order_by(Game.round_name))
+    return tuple(dates), tuple(rounds)
+
+def get_game_filter_options():
+    """Distinct game dates and round names for filter dropdowns, cached like get_game_team_names"""
+    return _game_filter_options(team_list_cache_bucket())
+
+def validate_volleyball_score(team1_score, team2_score):
+    """Raise ValueError unless the set score is a valid volleyball match result"""
+    if team1_score < 0 or team2_score < 0:
+        raise ValueError("Scores cannot be negative")
+    if (team1_score, team2_score) not in VALID_VB_SCORES:
+        raise ValueError("Invalid volleyball score")
+
 def calculate_points(prediction, game):
     """Calculate points based on the scoring system"""
     if not game.is_finished or prediction.team1_score is None or prediction.team2_score is None:
         return None
-    
-    predicted_winner = prediction.team1_score > prediction.team2_score
-    actual_winner = game.team1_score > game.team2_score
+    return score_points(prediction.team1_score, prediction.team2_score, game.team1_score, game.team2_score)
+
+@lru_cache(maxsize=None)
+def score_points(pred_team1, pred_team2, team1_score, team2_score):
+    """Points for a predicted vs actual set score; pure, so memoized over the few valid scores"""
+    predicted_winner = pred_team1 > pred_team2
+    actual_winner = team1_score > team2_score
     
     # Check if winner prediction is correct
     winner_correct = predicted_winner == actual_winner
     
     # Check if exact score is correct
-    exact_score = (prediction.team1_score == game.team1_score and 
-                  prediction.team2_score == game.team2_score)
+    exact_score = pred_team1 == team1_score and pred_team2 == team2_score
     
     # Check if total sets are correct
-    total_sets_correct = (prediction.team1_score + prediction.team2_score == 
-                         game.team1_score + game.team2_score)
+    total_sets_correct = pred_team1 + pred_team2 == team1_score + team2_score
     
     # Check if missed result by 1 set
-    score_diff = abs((prediction.team1_score - prediction.team2_score) - 
-                    (game.team1_score - game.team2_score))
+    score_diff = abs((pred_team1 - pred_team2) - (team1_score - team2_score))
     missed_by_one = score_diff == 1
     
     # Scoring logic
@@ -1197,6 +1642,11 @@ def calculate_points(prediction, game):
     else:
         return 0  # Completely wrong
 
+# Rows streamed per fetch during recalculation
+RECALC_BATCH_SIZE = 1000
+# Ids per IN list in bulk UPDATE and DELETE statements
+SQL_IN_BATCH_SIZE = 1000
+
 def recalculate_all_points_with_defaults(n_position):
     """
     Recalculate all points with default points for non-predictions
@@ -1204,18 +1654,19 @@ def recalculate_all_points_with_defaults(n_position):
     """
     try:
         # Get all finished games
-        finished_games = Game.query.filter(
+        finished = db.and_(
             Game.is_finished == True,
             Game.team1_score.isnot(None),
             Game.team2_score.isnot(None)
-        ).all()
+        )
+        finished_games = Game.query.filter(finished).order_by(Game.id).all()
         
         if not finished_games:
             return {"success": False, "error": "No finished games found"}
         
         # Get all users
-        all_users = User.query.all()
-        if not all_users:
+        all_user_ids = db.session.scalars(db.select(User.id)).all()
+        if not all_user_ids:
             return {"success": False, "error": "No users found"}
         
         total_games = len(finished_games)
@@ -1223,62 +1674,103 @@ def recalculate_all_points_with_defaults(n_position):
         total_predictions_created = 0
         total_points_updated = 0
         
-        for game in finished_games:
-            # Get ALL predictions for this game
-            all_predictions = Prediction.query.filter_by(game_id=game.id).all()
+        # Stream ALL predictions for the finished games in one query, grouped by game in game id order
+        prediction_rows = db.session.execute(
+            db.select(
+                Prediction.id, Prediction.game_id, Prediction.user_id,
+                Prediction.team1_score, Prediction.team2_score, Prediction.predicted_winner, Prediction.points
+            ).join(Game, Prediction.game_id == Game.id).where(finished)
+            .order_by(Prediction.game_id)
+            .execution_options(yield_per=RECALC_BATCH_SIZE)
+        )
+        rows_by_game = groupby(prediction_rows, key=attrgetter('game_id'))
+        next_group = next(rows_by_game, None)
+        
+        # Prediction ids to update, bucketed by their new points value, and rows to insert
+        ids_by_points = defaultdict(list)
+        new_prediction_rows = []
+        
+        # Nothing in the loop needs pending changes flushed; skip autoflush entirely
+        with db.session.no_autoflush:
+            for game in finished_games:
+                # Both sides are ordered by game id, so walk them in step
+                if next_group is not None and next_group[0] == game.id:
+                    all_predictions = list(next_group[1])
+                    next_group = next(rows_by_game, None)
+                else:
+                    all_predictions = []
             
-            # Separate real predictions (with actual scores) from default predictions (None scores)
-            real_predictions = [p for p in all_predictions if not p.is_default_prediction()]
-            default_predictions = [p for p in all_predictions if p.is_default_prediction()]
+                # Separate real predictions (with actual scores) from default predictions (None scores) in one pass
+                real_predictions = []
+                default_predictions = []
+                for p in all_predictions:
+                    if p.team1_score is None and p.team2_score is None and p.predicted_winner is None:
+                        default_predictions.append(p)
+                    else:
+                        real_predictions.append(p)
             
-            # Recalculate points for REAL predictions only
-            real_points = []
-            for prediction in real_predictions:
-                old_points = prediction.points
-                new_points = calculate_points(prediction, game)
-                prediction.points = new_points
-                if old_points != new_points:
-                    total_points_updated += 1
-                if new_points is not None:
-                    real_points.append(new_points)
+                # Recalculate points for REAL predictions only
+                real_points = []
+                for prediction in real_predictions:
+                    new_points = calculate_points(prediction, game)
+                    if prediction.points != new_points:
+                        ids_by_points[new_points].append(prediction.id)
+                        total_points_updated += 1
+                    if new_points is not None:
+                        real_points.append(new_points)
             
-            # Sort REAL points to find Nth worst (ascending order)
-            real_points.sort()
+                # Determine default points for non-predictors based on REAL predictions only
+                if len(real_points) >= n_position:
+                    # Only the n_position lowest values are needed, not a full sort
+                    default_points = heapq.nsmallest(n_position, real_points)[-1]
+                elif len(real_points) > 0:
+                    # If not enough real predictions exist, use the worst available
+                    default_points = min(real_points)
+                else:
+                    # No real predictions exist for this game, default to 0
+                    default_points = 0
             
-            # Determine default points for non-predictors based on REAL predictions only
-            if len(real_points) >= n_position:
-                default_points = real_points[n_position - 1]  # n_position-1 because 0-indexed
-            elif len(real_points) > 0:
-                # If not enough real predictions exist, use the worst available
-                default_points = real_points[0]
-            else:
-                # No real predictions exist for this game, default to 0
-                default_points = 0
+                # Update existing default predictions with new default points
+                for prediction in default_predictions:
+                    if prediction.points != default_points:
+                        ids_by_points[default_points].append(prediction.id)
+                        total_points_updated += 1
             
-            # Update existing default predictions with new default points
-            for prediction in default_predictions:
-                if prediction.points != default_points:
-                    prediction.points = default_points
-                    total_points_updated += 1
+                # Find users who don't have ANY prediction (real or default) for this game
+                existing_user_ids = {p.user_id for p in all_predictions}
+                non_predictors = [user_id for user_id in all_user_ids if user_id not in existing_user_ids]
             
-            # Find users who don't have ANY prediction (real or default) for this game
-            existing_user_ids = {p.user_id for p in all_predictions}
-            non_predictors = [user for user in all_users if user.id not in existing_user_ids]
+                # Create NEW default predictions for users who have none
+                for user_id in non_predictors:
+                    new_prediction_rows.append({
+                        'user_id': user_id,
+                        'game_id': game.id,
+                        'team1_score': None,  # No actual prediction made
+                        'team2_score': None,  # No actual prediction made
+                        'predicted_winner': None,
+                        'points': default_points
+                    })
+                    total_predictions_created += 1
             
-            # Create NEW default predictions for users who have none
-            for user in non_predictors:
-                new_prediction = Prediction(
-                    user_id=user.id,
-                    game_id=game.id,
-                    team1_score=None,  # No actual prediction made
-                    team2_score=None,  # No actual prediction made
-                    predicted_winner=None,
-                    points=default_points
+                processed_games += 1
+        
+
+        # One UPDATE per distinct points value (in bounded IN lists) instead of one per prediction
+        for points, prediction_ids in ids_by_points.items():
+            for start in range(0, len(prediction_ids), SQL_IN_BATCH_SIZE):
+                db.session.execute(
+                    db.update(Prediction)
+                    .where(Prediction.id.in_(prediction_ids[start:start + SQL_IN_BATCH_SIZE]))
+                    .values(points=points)
+                    .execution_options(synchronize_session=False)
                 )
-                db.session.add(new_prediction)
-                total_predictions_created += 1
-            
-            processed_games += 1
+        
+        # All default predictions in a single multi-row INSERT
+        if new_prediction_rows:
+            db.session.execute(db.insert(Prediction), new_prediction_rows)
+        
+        # Always refresh stored totals so this also repairs them after raw SQL restores
+        mark_scores_stale()
         
         # Commit all changes
         db.session.commit()
@@ -1298,6 +1790,10 @@ def recalculate_all_points_with_defaults(n_position):
         db.session.rollback()
         return {"success": False, "error": f"Error during recalculation: {str(e)}"}
 
+# Tournament scoring: any mention of a podium team, plus an exact-place bonus for 1st/2nd/3rd
+TOURNAMENT_MENTION_POINTS = 15
+TOURNAMENT_EXACT_PLACE_BONUS = (15, 5, 5)
+
 def calculate_tournament_points(prediction, tournament_config):
     """Calculate points for tournament predictions"""
     if not tournament_config.are_results_available():
@@ -1305,32 +1801,43 @@ def calculate_tournament_points(prediction, tournament_config):
 
     points = 0
 
-    # Get user's predictions as a list
-    user_predictions = [prediction.first_place, prediction.second_place, prediction.third_place]
-
-    # Check if user mentioned actual 1st place anywhere in their predictions - 15 points
-    if tournament_config.first_place_result in user_predictions:
-        points += 15
-        # Additional 15 points if predicted in exact 1st place (total 30 points)
-        if prediction.first_place == tournament_config.first_place_result:
-            points += 15
-
-    # Check if user mentioned actual 2nd place anywhere in their predictions - 15 points
-    if tournament_config.second_place_result in user_predictions:
-        points += 15
-        # Additional 5 points if predicted in exact 2nd place
-        if prediction.second_place == tournament_config.second_place_result:
-            points += 5
-
-    # Check if user mentioned actual 3rd place anywhere in their predictions - 15 points
-    if tournament_config.third_place_result in user_predictions:
-        points += 15
-        # Additional 5 points if predicted in exact 3rd place
-        if prediction.third_place == tournament_config.third_place_result:
-            points += 5
+    # Get user's predictions as a set; each podium result is checked against it once
+    user_predictions = {prediction.first_place, prediction.second_place, prediction.third_place}
+    podium = (
+        (tournament_config.first_place_result, prediction.first_place),
+        (tournament_config.second_place_result, prediction.second_place),
+        (tournament_config.third_place_result, prediction.third_place),
+    )
+
+    for (actual, predicted), exact_bonus in zip(podium, TOURNAMENT_EXACT_PLACE_BONUS):
+        # 15 points for mentioning the team anywhere, plus a bonus for the exact place
+        if actual in user_predictions:
+            points += TOURNAMENT_MENTION_POINTS
+            if predicted == actual:
+                points += exact_bonus
 
     return points
 
+def tournament_points_expression(tournament_config):
+    """calculate_tournament_points as a SQL expression over the TournamentPrediction columns"""
+    if not tournament_config.are_results_available():
+        return db.literal(0)
+
+    predicted_places = (TournamentPrediction.first_place,
+                        TournamentPrediction.second_place,
+                        TournamentPrediction.third_place)
+    podium = (tournament_config.first_place_result,
+              tournament_config.second_place_result,
+              tournament_config.third_place_result)
+
+    points = db.literal(0)
+    for actual, predicted, exact_bonus in zip(podium, predicted_places, TOURNAMENT_EXACT_PLACE_BONUS):
+        points = points + db.case(
+            (predicted == actual, TOURNAMENT_MENTION_POINTS + exact_bonus),
+            (db.or_(*(place == actual for place in predicted_places)), TOURNAMENT_MENTION_POINTS),
+            else_=0)
+    return points
+
 # Routes
 @app.route('/')
 def index():
@@ -1396,7 +1903,14 @@ def login():
             return render_template('login.html')
         
         user = User.query.filter_by(email=email).first()
-        if user and user.check_password(password):
+        if user:
+            password_ok = user.check_password(password)
+        else:
+            # Hash against a dummy value so unknown emails take as long as wrong passwords
+            check_password_hash(INVALID_USER_PASSWORD_HASH, password)
+            password_ok = False
+
+        if password_ok:
             login_user(user, remember=remember)
             flash(f'Welcome back, {user.name}!', 'success')
             
@@ -1415,6 +1929,18 @@ def logout():
     flash('You have been logged out.', 'info')
     return redirect(url_for('index'))
 
+def game_date_range(first_date, last_date=None):
+    """Half-open Game.game_date range covering whole days, so the game_date index stays usable"""
+    last_date = last_date or first_date
+    return db.and_(
+        Game.game_date >= datetime.combine(first_date, datetime.min.time()),
+        Game.game_date < datetime.combine(last_date + timedelta(days=1), datetime.min.time())
+    )
+
+def prediction_deadline_passed():
+    """SQL condition for games whose deadline has passed; deadlines are stored as naive Riga time"""
+    return Game.prediction_deadline <= get_riga_now_naive()
+
 @app.route('/predictions')
 @login_required
 def predictions():
@@ -1422,18 +1948,19 @@ def predictions():
     selected_date = request.args.get('date')
     selected_round = request.args.get('round')
     
+    # Riga date read once for both the default-filter check and the today/tomorrow filter
+    current_date = get_riga_time().date()
+    tomorrow_date = current_date + timedelta(days=1)
+    
     # Smart default filter: today/tomorrow if games exist, otherwise upcoming
     show_filter = request.args.get('filter')
     if not show_filter:
         # Check if there are games today or tomorrow
-        current_date = get_riga_time().date()
-        tomorrow_date = current_date + timedelta(days=1)
-        today_tomorrow_games = Game.query.filter(
-            db.func.date(Game.game_date) >= current_date,
-            db.func.date(Game.game_date) <= tomorrow_date
-        ).count()
+        has_today_tomorrow_games = db.session.scalar(
+            db.select(db.select(Game.id).where(game_date_range(current_date, tomorrow_date)).exists())
+        )
         
-        show_filter = 'today_tomorrow' if today_tomorrow_games > 0 else 'upcoming'
+        show_filter = 'today_tomorrow' if has_today_tomorrow_games else 'upcoming'
     
     # Base query
     games_query = Game.query
@@ -1441,12 +1968,7 @@ def predictions():
     # Apply filters
     if show_filter == 'today_tomorrow':
         # Default filter: show games for today and tomorrow only
-        current_date = get_riga_time().date()
-        tomorrow_date = current_date + timedelta(days=1)
-        games_query = games_query.filter(
-            db.func.date(Game.game_date) >= current_date,
-            db.func.date(Game.game_date) <= tomorrow_date
-        )
+        games_query = games_query.filter(game_date_range(current_date, tomorrow_date))
     elif show_filter == 'all':
         # Show all games
         pass  # No additional filtering
@@ -1461,7 +1983,7 @@ def predictions():
     if selected_date:
         try:
             filter_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
-            games_query = games_query.filter(db.func.date(Game.game_date) == filter_date)
+            games_query = games_query.filter(game_date_range(filter_date))
         except ValueError:
             flash('Invalid date format', 'error')
     
@@ -1473,9 +1995,7 @@ def predictions():
     games = games_query.order_by(Game.game_date.asc()).all()
     
     # Get unique dates and rounds for filter dropdowns
-    all_games = Game.query.all()
-    unique_dates = sorted(list(set(game.game_date.date() for game in all_games)))
-    unique_rounds = sorted(list(set(game.round_name for game in all_games)))
+    unique_dates, unique_rounds = get_game_filter_options()
     
     return render_template('predictions.html', 
                          games=games,
@@ -1488,34 +2008,96 @@ def predictions():
 @app.route('/leaderboard')
 @login_required
 def leaderboard():
-    users = User.query.all()
+    # Read the stored aggregates as plain rows; only users whose columns were never
+    # computed fall back to one grouped score_stats query for all of them
+    rows = db.session.execute(
+        db.select(User.id, User.name, User.total_score, User.filled_count, User.finished_count,
+                  User.correct_count, User.finished_correct_count)
+        .order_by(User.total_score.desc(), User.id.desc())
+    ).all()
+    missing = [row.id for row in rows if row.total_score is None]
+    live_stats = User.score_stats(missing) if missing else {}
     user_stats = []
 
-    for user in users:
-        stats = {
-            'id': user.id,
-            'name': user.name,
-            'total_score': user.get_total_score(),
-            'all_predictions_filled': user.get_all_predictions_filled(),
-            'total_predictions': user.get_total_predictions(),
-            'correct_predictions': user.get_correct_predictions(),
-            'accuracy': user.get_accuracy_percentage()
-        }
-        user_stats.append(stats)
+    for row in rows:
+        if row.total_score is None:
+            stats = live_stats.get(row.id, EMPTY_SCORE_STATS)
+            total_score, filled, finished, correct, finished_correct = (
+                stats['total_score'], stats['filled'], stats['finished'], stats['correct'], stats['finished_correct'])
+        else:
+            total_score, filled, finished, correct, finished_correct = (
+                row.total_score, row.filled_count or 0, row.finished_count or 0,
+                row.correct_count or 0, row.finished_correct_count or 0)
+        user_stats.append({
+            'id': row.id,
+            'name': row.name,
+            'total_score': total_score,
+            'all_predictions_filled': filled,
+            'total_predictions': finished,
+            'correct_predictions': correct,
+            'accuracy': round((finished_correct / finished) * 100, 1) if finished else 0.0
+        })
+    if missing:
+        # NULL totals sorted first (PostgreSQL) or last (SQLite); place them by their live score
+        user_stats.sort(key=lambda stats: (stats['total_score'], stats['id']), reverse=True)
 
-    user_stats.sort(key=lambda x: x['total_score'], reverse=True)
     return render_template('leaderboard.html', users=user_stats)
 
 @app.route('/race-chart')
 @login_required
 def race_chart():
     """Display cumulative points race chart"""
-    users = User.query.all()
-    games = Game.query.filter_by(is_finished=True).order_by(Game.game_date).all()
+    # The page only lists player checkboxes; chart data comes from the API
+    users = db.session.execute(db.select(User.id, User.name).order_by(User.id)).all()
+    finished_count = db.session.scalar(db.select(db.func.count(Game.id)).where(Game.is_finished.is_(True)))
+
+    logging.info(f"Race chart page: {len(users)} users, {finished_count} finished games")
 
-    logging.info(f"Race chart page: {len(users)} users, {len(games)} finished games")
+    return render_template('race_chart.html', users=users)
 
-    return render_template('race_chart.html', users=users, games=games)
+def race_chart_standings(game_ids, user_ids, tournament_finalized):
+    """Cumulative points and position per game for each user, as {user_id: (points, positions)}
+
+    game_ids and user_ids are in chart order; ties in a game keep the order of user_ids.
+    """
+    game_seq = db.case({game_id: seq for seq, game_id in enumerate(game_ids)}, value=Game.id)
+    user_seq = db.case({user_id: seq for seq, user_id in enumerate(user_ids)}, value=User.id)
+    # Tournament points count towards the last charted game once results are final
+    tournament_bonus = db.case(
+        (db.and_(db.literal(tournament_finalized), game_seq == len(game_ids) - 1),
+         db.func.coalesce(TournamentPrediction.points_earned, 0)),
+        else_=0)
+
+    running = (
+        db.select(
+            User.id.label('user_id'),
+            user_seq.label('user_seq'),
+            game_seq.label('game_seq'),
+            (db.func.sum(db.func.coalesce(Prediction.points, 0)).over(partition_by=User.id, order_by=game_seq)
+             + tournament_bonus).label('cumulative'))
+        .select_from(User)
+        .join(Game, db.true())
+        .outerjoin(Prediction, db.and_(Prediction.user_id == User.id, Prediction.game_id == Game.id))
+        .outerjoin(TournamentPrediction, TournamentPrediction.user_id == User.id)
+        .where(User.id.in_(user_ids), Game.id.in_(game_ids))
+        .subquery()
+    )
+    position = db.func.row_number().over(
+        partition_by=running.c.game_seq,
+        order_by=(running.c.cumulative.desc(), running.c.user_seq))
+    rows = db.session.execute(
+        db.select(running.c.user_id, running.c.cumulative, position)
+        .order_by(running.c.user_seq, running.c.game_seq)
+    )
+
+    standings = {}
+    for user_id, user_rows in groupby(rows, key=lambda row: row[0]):
+        points, positions = [], []
+        for _, cumulative, pos in user_rows:
+            points.append(cumulative)
+            positions.append(pos)
+        standings[user_id] = (points, positions)
+    return standings
 
 @app.route('/api/race-chart-data')
 @login_required
@@ -1562,17 +2144,21 @@ def get_race_chart_data():
                 }
             })
 
-        # Get users to include in chart
+        # Get users to include in chart, sorted by stored total score for better color assignment
+        users_query = User.query.options(selectinload(User.tournament_prediction)).order_by(User.total_score.desc(), User.id)
+        if app.debug or app.testing:
+            # Everything the loop needs is loaded above; fail loudly if a lazy load sneaks back in
+            users_query = users_query.options(raiseload('*'))
         if selected_user_ids:
             try:
                 user_ids = [int(uid) for uid in selected_user_ids]
-                users = User.query.filter(User.id.in_(user_ids)).all()
+                users = users_query.filter(User.id.in_(user_ids)).all()
                 logging.info(f"Selected {len(users)} specific users")
             except ValueError as e:
                 logging.error(f"Error parsing user IDs: {e}")
-                users = User.query.all()
+                users = users_query.all()
         else:
-            users = User.query.all()
+            users = users_query.all()
             logging.info(f"Using all {len(users)} users")
 
         # Build cumulative data
@@ -1603,68 +2189,44 @@ def get_race_chart_data():
             '#9B59B6', '#1ABC9C', '#34495E', '#E67E22', '#95A5A6'
         ]
 
-        # Sort users by total score for better color assignment
-        try:
-            users_sorted = sorted(users, key=lambda u: u.get_total_score(), reverse=True)
-            logging.info(f"Sorted {len(users_sorted)} users by score")
-        except Exception as e:
-            logging.error(f"Error sorting users: {e}")
-            users_sorted = users
+        # users is already ordered by stored total score; read totals once, computing any
+        # not-yet-stored ones in a single grouped query
+        missing = [user.id for user in users if user.total_score is None]
+        live_stats = User.score_stats(missing) if missing else {}
+        totals = {user.id: user.total_score if user.total_score is not None
+                  else live_stats.get(user.id, EMPTY_SCORE_STATS)['total_score'] for user in users}
 
         # Check if tournament results are finalized
         tournament_config = TournamentConfig.query.first()
         tournament_finalized = tournament_config and tournament_config.are_results_available()
 
-        # First, calculate cumulative points for all users for each game
+        # Running totals and per-game positions come back from one windowed query
+        race_rows = race_chart_standings([game.id for game in games], [user.id for user in users],
+                                         bool(tournament_finalized))
+
         users_cumulative_data = []
-        for user in users_sorted:
+        for user in users:
             try:
-                cumulative_points = 0
                 tournament_points = user.tournament_prediction.points_earned if user.tournament_prediction else 0
-                points_data = []
-
-                # Calculate cumulative points for each game
-                for game_index, game in enumerate(games):
-                    # Find user's prediction for this game
-                    prediction = next((p for p in user.predictions if p.game_id == game.id), None)
-
-                    if prediction and prediction.points is not None:
-                        cumulative_points += prediction.points
-
-                    # Add tournament points at the end if tournament is finalized
-                    current_total = cumulative_points
-                    if tournament_finalized and game_index == len(games) - 1:
-                        current_total += tournament_points
-
-                    points_data.append(current_total)
+                points_data, position_data = race_rows[user.id]
 
                 users_cumulative_data.append({
                     'user': user,
                     'points_data': points_data,
+                    'position_data': position_data,
                     'tournament_points': tournament_points,
-                    'total_score': user.get_total_score(),
+                    'total_score': totals[user.id],
                     'tournament_finalized': tournament_finalized
                 })
 
             except Exception as e:
                 logging.error(f"Error processing user {user.name}: {e}")
 
-        # Now calculate positions for each game
+        # Now collect positions for each user
         for i, user_data in enumerate(users_cumulative_data):
             try:
                 user = user_data['user']
-                position_data = []
-
-                # Calculate position for each game
-                for game_index in range(len(games)):
-                    # Get all users' scores at this point
-                    scores_at_game = [(ud['points_data'][game_index], idx) for idx, ud in enumerate(users_cumulative_data)]
-                    # Sort by score (descending) to get rankings
-                    scores_at_game.sort(key=lambda x: x[0], reverse=True)
-
-                    # Find this user's position
-                    user_position = next(pos + 1 for pos, (score, idx) in enumerate(scores_at_game) if idx == i)
-                    position_data.append(user_position)
+                position_data = user_data['position_data']
 
                 player_data = {
                     'name': user.name,
@@ -1696,16 +2258,45 @@ def get_race_chart_data():
 def get_user_message():
     """API endpoint to get AI-generated message for current user asynchronously"""
     try:
-        ai_generator = AIMessageGenerator()
-        current_user_message = ai_generator.get_or_create_message(current_user.id)
+        now = time.monotonic()
+        entry = _user_message_poll_cache.get(current_user.id)
+        if entry and entry[0] > now:
+            return jsonify({'success': True, 'message': entry[1]})
+        
+        current_user_message = ai_message_generator.get_or_create_message(current_user.id)
         # Mark message as viewed when user requests it
-        ai_generator.mark_message_viewed(current_user.id)
+        ai_message_generator.mark_message_viewed(current_user.id)
+        if len(_user_message_poll_cache) >= PLAYER_MESSAGE_CACHE_MAX_ENTRIES:
+            _user_message_poll_cache.clear()
+        _user_message_poll_cache[current_user.id] = (now + USER_MESSAGE_POLL_TTL_SECONDS, current_user_message)
         return jsonify({'success': True, 'message': current_user_message})
     except Exception as e:
         logging.error(f"Error getting AI message for current user {current_user.id}: {str(e)}")
         fallback_message = {'text': '🎯 Keep making those predictions!', 'category': 'general', 'cached': False}
         return jsonify({'success': True, 'message': fallback_message})
 
+def save_highlight_rows(rows):
+    """Insert highlight rows in one statement, falling back to row-by-row saves if the batch fails"""
+    try:
+        highlights = db.session.scalars(db.insert(GameHighlight).returning(GameHighlight), rows).all()
+        db.session.commit()
+        return highlights
+    except Exception as e:
+        logging.error(f"Error committing highlights batch, saving individually: {e}")
+        db.session.rollback()
+
+    highlights = []
+    for row in rows:
+        highlight = GameHighlight(**row)
+        try:
+            db.session.add(highlight)
+            db.session.commit()
+            highlights.append(highlight)
+        except Exception as e:
+            logging.error(f"Error committing highlight: {e}")
+            db.session.rollback()
+    return highlights
+
 @app.route('/highlights')
 @login_required
 def highlights():
@@ -1719,6 +2310,7 @@ def highlights():
         ).order_by(Game.game_date.desc()).limit(2).all()
 
         games_with_highlights = []
+        new_highlight_rows = []
 
         for game in recent_games:
             # Get existing highlights for this game
@@ -1735,57 +2327,53 @@ def highlights():
                 from youtube_service import search_game_highlights
                 videos = search_game_highlights(game.id)
 
-                # Save the best videos as highlights
+                # Collect the best videos as highlights; they are inserted together below
                 for video in videos[:3]:  # Save top 3
                     try:
-                        highlight = GameHighlight(
-                            game_id=game.id,
-                            youtube_url=video['youtube_url'],
-                            youtube_video_id=video['video_id'],
-                            title=video['title'],
-                            description=video['description'][:500] if video['description'] else '',
-                            thumbnail_url=video['thumbnail_url'],
-                            duration=video.get('duration', ''),
-                            channel_name=video['channel_name'],
-                            view_count=video.get('view_count', 0),
-                            upload_date=video['upload_date'],
-                            auto_detected=True
-                        )
-                        db.session.add(highlight)
-                        existing_highlights.append(highlight)
+                        new_highlight_rows.append({
+                            'game_id': game.id,
+                            'youtube_url': video['youtube_url'],
+                            'youtube_video_id': video['video_id'],
+                            'title': video['title'],
+                            'description': video['description'][:500] if video['description'] else '',
+                            'thumbnail_url': video['thumbnail_url'],
+                            'duration': video.get('duration', ''),
+                            'channel_name': video['channel_name'],
+                            'view_count': video.get('view_count', 0),
+                            'upload_date': video['upload_date'],
+                            'auto_detected': True
+                        })
                     except Exception as e:
                         logging.error(f"Error saving highlight: {e}")
                         continue
 
-                try:
-                    db.session.commit()
-                except Exception as e:
-                    logging.error(f"Error committing highlights: {e}")
-                    db.session.rollback()
-
             games_with_highlights.append({
                 'game': game,
                 'highlights': existing_highlights[:5]  # Limit to 5 highlights per game
             })
 
+        if new_highlight_rows:
+            new_highlights = save_highlight_rows(new_highlight_rows)
+            for entry in games_with_highlights:
+                if not entry['highlights']:
+                    entry['highlights'] = [h for h in new_highlights if h.game_id == entry['game'].id]
+
         # Get featured videos from database (admin-managed)
-        featured_videos = FeaturedVideo.query.filter_by(is_active=True).order_by(
-            FeaturedVideo.display_order.asc(),
-            FeaturedVideo.created_at.desc()
-        ).limit(6).all()
+        # Only the display columns, as plain rows rather than ORM instances
+        featured_videos = db.session.execute(
+            db.select(FeaturedVideo.title, FeaturedVideo.youtube_url, FeaturedVideo.thumbnail_url,
+                      FeaturedVideo.channel_name, FeaturedVideo.upload_date, FeaturedVideo.view_count,
+                      FeaturedVideo.duration)
+            .where(FeaturedVideo.is_active == True)
+            .order_by(FeaturedVideo.display_order.asc(), FeaturedVideo.created_at.desc())
+            .limit(6)
+        ).mappings()
 
         # Convert to format expected by template
-        featured_videos_data = []
-        for video in featured_videos:
-            featured_videos_data.append({
-                'title': video.title,
-                'youtube_url': video.youtube_url,
-                'thumbnail_url': video.thumbnail_url,
-                'channel_name': video.channel_name,
-                'upload_date': video.upload_date,
-                'view_count': video.view_count,
-                'duration': video.format_duration()
-            })
+        featured_videos_data = [
+            {**video, 'duration': format_video_duration(video['duration'])}
+            for video in featured_videos
+        ]
 
         return render_template('highlights.html',
                              games_with_highlights=games_with_highlights,
@@ -1815,13 +2403,8 @@ def make_prediction():
         team1_score = int(team1_score)
         team2_score = int(team2_score)
         
-        if team1_score < 0 or team2_score < 0:
-            raise ValueError("Scores cannot be negative")
-        
         # Volleyball scoring validation: one team must win 3 sets, other 0-2
-        if not ((team1_score == 3 and team2_score in [0, 1, 2]) or 
-                (team2_score == 3 and team1_score in [0, 1, 2])):
-            raise ValueError("Invalid volleyball score")
+        validate_volleyball_score(team1_score, team2_score)
             
     except ValueError as e:
         if "Invalid volleyball score" in str(e):
@@ -1830,27 +2413,28 @@ def make_prediction():
             flash('Please enter valid values', 'error')
         return redirect(url_for('predictions', anchor=f'game_{game_id}'))
     
-    game = Game.query.get(game_id)
+    # Only the columns this handler reads, not a full Game instance
+    game = db.session.execute(
+        db.select(Game.team1, Game.team2, Game.prediction_deadline).where(Game.id == game_id)
+    ).first()
     if not game:
         flash('Game not found', 'error')
         return redirect(url_for('predictions'))
     
     # Check prediction deadline - using Riga timezone
-    current_time = get_riga_time()
-    deadline = to_riga_time(game.prediction_deadline)
-    
-    if current_time >= deadline:
+    if get_riga_now_naive() >= game.prediction_deadline:
         flash('Prediction deadline has passed for this game', 'error')
         return redirect(url_for('predictions', anchor=f'game_{game_id}'))
     
+    predicted_winner = game.team1 if team1_score > team2_score else game.team2
+    
     # Check if prediction already exists
     existing = Prediction.query.filter_by(user_id=current_user.id, game_id=game_id).first()
     if existing:
         existing.team1_score = team1_score
         existing.team2_score = team2_score
-        existing.predicted_winner = game.team1 if team1_score > team2_score else game.team2
+        existing.predicted_winner = predicted_winner
     else:
-        predicted_winner = game.team1 if team1_score > team2_score else game.team2
         prediction = Prediction(
             user_id=current_user.id,
             game_id=game_id,
@@ -1883,11 +2467,7 @@ def admin():
     if tournament_teams:
         teams = [team.name for team in tournament_teams]
     else:
-        teams = set()
-        for game in games:
-            teams.add(game.team1)
-            teams.add(game.team2)
-        teams = sorted(list(teams))
+        teams = list(get_game_team_names())
     
     # Get recalculation config
     recalculation_config = RecalculationConfig.get_current_config()
@@ -1901,6 +2481,22 @@ def admin():
                          teams=teams,
                          recalculation_config=recalculation_config)
 
+CSV_DATETIME_FORMATS = ('%Y-%m-%d %H:%M', '%Y-%m-%d,%H:%M')
+
+def parse_csv_datetime(value):
+    """Parse a 'YYYY-MM-DD HH:MM' (or comma-separated) CSV value, trying the fast ISO parser first"""
+    if len(value) == 16 and value[10] in ' ,':
+        try:
+            return datetime.fromisoformat(f"{value[:10]} {value[11:]}")
+        except ValueError:
+            pass
+    for fmt in CSV_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f'Unrecognized date/time: {value}')
+
 @app.route('/upload_games', methods=['POST'])
 @login_required
 @admin_required
@@ -1920,60 +2516,59 @@ def upload_games():
             content = file.read().decode('utf-8').splitlines()
             reader = csv.DictReader(content)
             
-            games_added = 0
+            parsed_rows = []
             for row in reader:
                 # Expected CSV columns: team1, team2, date, time, round, prediction_deadline
                 try:
-                    # Handle different date/time formats
-                    if 'time' in row and row['time']:
-                        # Separate date and time columns
-                        game_date = datetime.strptime(f"{row['date']} {row['time']}", "%Y-%m-%d %H:%M")
-                    else:
-                        # Single datetime column
-                        game_date = datetime.strptime(row['date'], "%Y-%m-%d %H:%M")
+                    # Handle separate date and time columns, or a single datetime column
+                    game_date = parse_csv_datetime(f"{row['date']} {row['time']}" if row.get('time') else row['date'])
                 except ValueError:
-                    try:
-                        # Try with comma between date and time
-                        game_date = datetime.strptime(f"{row['date']},{row['time']}", "%Y-%m-%d,%H:%M")
-                    except ValueError:
-                        flash(f'Invalid date/time format in row: {row}', 'error')
-                        continue
+                    flash(f'Invalid date/time format in row: {row}', 'error')
+                    continue
                 
                 # Parse prediction deadline
                 if 'prediction_deadline' in row and row['prediction_deadline']:
                     try:
-                        prediction_deadline = datetime.strptime(row['prediction_deadline'], "%Y-%m-%d %H:%M")
+                        prediction_deadline = parse_csv_datetime(row['prediction_deadline'])
                     except ValueError:
-                        try:
-                            # Try with comma format
-                            prediction_deadline = datetime.strptime(row['prediction_deadline'], "%Y-%m-%d,%H:%M")
-                        except ValueError:
-                            flash(f'Invalid prediction deadline format: {row["prediction_deadline"]}', 'error')
-                            # Default: 30 minutes before game start
-                            prediction_deadline = game_date - timedelta(minutes=30)
+                        flash(f'Invalid prediction deadline format: {row["prediction_deadline"]}', 'error')
+                        # Default: 30 minutes before game start
+                        prediction_deadline = game_date - timedelta(minutes=30)
                 else:
                     # Default: 30 minutes before game start
                     prediction_deadline = game_date - timedelta(minutes=30)
                 
-                # Check if game already exists
-                existing = Game.query.filter_by(
-                    team1=row['team1'],
-                    team2=row['team2'],
-                    game_date=game_date
-                ).first()
-                
-                if not existing:
-                    game = Game(
-                        team1=row['team1'],
-                        team2=row['team2'],
-                        game_date=game_date,
-                        prediction_deadline=prediction_deadline,
-                        round_name=row['round']
-                    )
-                    db.session.add(game)
-                    games_added += 1
+                parsed_rows.append((row, game_date, prediction_deadline))
+            
+            # Look up all possible duplicates in one query instead of one per row
+            existing_keys = set()
+            if parsed_rows:
+                existing_keys = set(db.session.execute(
+                    db.select(Game.team1, Game.team2, Game.game_date)
+                    .where(Game.game_date.in_({game_date for _, game_date, _ in parsed_rows}))
+                ).tuples())
+            
+            new_rows = []
+            for row, game_date, prediction_deadline in parsed_rows:
+                key = (row['team1'], row['team2'], game_date)
+                if key not in existing_keys:
+                    existing_keys.add(key)
+                    new_rows.append({
+                        'team1': row['team1'],
+                        'team2': row['team2'],
+                        'game_date': game_date,
+                        'prediction_deadline': prediction_deadline,
+                        'round_name': row['round']
+                    })
+            
+            # All new games in a single multi-row INSERT
+            if new_rows:
+                db.session.execute(db.insert(Game), new_rows)
+            games_added = len(new_rows)
             
             db.session.commit()
+            _game_team_names.cache_clear()
+            _game_filter_options.cache_clear()
             flash(f'Successfully imported {games_added} games', 'success')
             
         except Exception as e:
@@ -2002,7 +2597,9 @@ def upload_tournament_teams():
             content = file.read().decode('utf-8').splitlines()
             reader = csv.DictReader(content)
             
-            teams_added = 0
+            # Load existing teams once instead of querying per row
+            existing_teams = {team.name: team for team in TournamentTeam.query.all()}
+            new_rows = {}
             for row in reader:
                 # Expected CSV columns: team_name/name/team, country_code (optional)
                 team_name = row.get('team_name') or row.get('name') or row.get('team')
@@ -2019,18 +2616,21 @@ def upload_tournament_teams():
                     country_code = get_country_code(team_name)
                 
                 # Check if team already exists
-                existing = TournamentTeam.query.filter_by(name=team_name).first()
+                existing = existing_teams.get(team_name)
                 
                 if not existing:
-                    team = TournamentTeam(name=team_name, country_code=country_code)
-                    db.session.add(team)
-                    teams_added += 1
+                    new_rows.setdefault(team_name, {'name': team_name, 'country_code': country_code})
                 elif country_code and not existing.country_code:
                     # Update existing team with country code if missing
                     existing.country_code = country_code
-                    db.session.add(existing)
+            
+            # All new teams in a single multi-row INSERT
+            if new_rows:
+                db.session.execute(db.insert(TournamentTeam), list(new_rows.values()))
+            teams_added = len(new_rows)
             
             db.session.commit()
+            _tournament_team_names.cache_clear()
             flash(f'Successfully imported {teams_added} tournament teams', 'success')
             
         except Exception as e:
@@ -2063,6 +2663,7 @@ def delete_tournament_team(team_id):
     # Delete the team
     db.session.delete(team)
     db.session.commit()
+    _tournament_team_names.cache_clear()
     
     flash(f'Tournament team "{team.name}" has been deleted', 'success')
     return redirect(url_for('admin'))
@@ -2083,13 +2684,8 @@ def update_result():
         game_id = int(game_id)
         team1_score = int(team1_score)
         team2_score = int(team2_score)
-        if team1_score < 0 or team2_score < 0:
-            raise ValueError("Scores cannot be negative")
-        
         # Volleyball scoring validation: one team must win 3 sets, other 0-2
-        if not ((team1_score == 3 and team2_score in [0, 1, 2]) or 
-                (team2_score == 3 and team1_score in [0, 1, 2])):
-            raise ValueError("Invalid volleyball score")
+        validate_volleyball_score(team1_score, team2_score)
             
     except ValueError as e:
         if "Invalid volleyball score" in str(e):
@@ -2104,10 +2700,29 @@ def update_result():
         game.team2_score = team2_score
         game.is_finished = True
         
-        # Recalculate points for all predictions of this game
-        predictions = Prediction.query.filter_by(game_id=game_id).all()
-        for prediction in predictions:
-            prediction.points = calculate_points(prediction, game)
+        # Recalculate points for all predictions of this game from their score columns only
+        ids_by_points = defaultdict(list)
+        prediction_rows = db.session.execute(
+            db.select(Prediction.id, Prediction.team1_score, Prediction.team2_score, Prediction.points)
+            .where(Prediction.game_id == game_id)
+        )
+        for prediction_id, pred_team1, pred_team2, old_points in prediction_rows:
+            if pred_team1 is None or pred_team2 is None:
+                new_points = None
+            else:
+                new_points = score_points(pred_team1, pred_team2, team1_score, team2_score)
+            if new_points != old_points:
+                ids_by_points[new_points].append(prediction_id)
+        
+        # One UPDATE per distinct points value (in bounded IN lists) instead of one per prediction
+        for points, prediction_ids in ids_by_points.items():
+            for start in range(0, len(prediction_ids), SQL_IN_BATCH_SIZE):
+                db.session.execute(
+                    db.update(Prediction)
+                    .where(Prediction.id.in_(prediction_ids[start:start + SQL_IN_BATCH_SIZE]))
+                    .values(points=points)
+                    .execution_options(synchronize_session=False)
+                )
         
         db.session.commit()
         flash('Game result updated and points recalculated!', 'success')
@@ -2128,9 +2743,17 @@ def delete_game(game_id):
     # Count predictions before deletion
     prediction_count = Prediction.query.filter_by(game_id=game_id).count()
     
-    # Delete the game - predictions will be automatically deleted due to cascade='all, delete-orphan'
-    db.session.delete(game)
-    db.session.commit()
+    # Delete the game - the database cascades the delete to its predictions and highlights
+    try:
+        db.session.delete(game)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error deleting game {game_id}: {str(e)}")
+        flash(f'Error deleting game: {str(e)}', 'error')
+        return redirect(url_for('admin'))
+    _game_team_names.cache_clear()
+    _game_filter_options.cache_clear()
     
     if prediction_count > 0:
         flash(f'Game "{game.team1} vs {game.team2}" and {prediction_count} related predictions have been deleted', 'success')
@@ -2150,40 +2773,45 @@ def bulk_delete_games():
             flash('No games selected for deletion', 'error')
             return redirect(url_for('admin'))
         
-        deleted_count = 0
         errors = []
-        
+        requested_ids = set()
         for game_id in game_ids:
             try:
-                game = Game.query.get(int(game_id))
-                if not game:
-                    errors.append(f"Game {game_id} not found")
-                    continue
-                    
-                # Delete the game - predictions will be automatically deleted due to cascade='all, delete-orphan'
-                db.session.delete(game)
-                deleted_count += 1
-                logging.debug(f"Marked game {game_id} for deletion")
-                
-            except Exception as e:
-                error_msg = f"Error processing game {game_id}: {str(e)}"
-                errors.append(error_msg)
-                logging.error(error_msg)
-                continue
+                requested_ids.add(int(game_id))
+            except ValueError:
+                errors.append(f"Invalid game id {game_id}")
+        
+        # Existence checks and deletes run in bounded IN lists; missing ids are reported from the set difference
+        sorted_ids = sorted(requested_ids)
+        id_batches = [sorted_ids[start:start + SQL_IN_BATCH_SIZE]
+                      for start in range(0, len(sorted_ids), SQL_IN_BATCH_SIZE)]
+        existing_ids = set()
+        for batch in id_batches:
+            existing_ids.update(db.session.scalars(db.select(Game.id).where(Game.id.in_(batch))))
+        errors.extend(f"Game {game_id} not found" for game_id in sorted(requested_ids - existing_ids))
+        
+        deleted_count = 0
+        if existing_ids:
+            # Predictions and highlights go with their games via ON DELETE CASCADE
+            for batch in id_batches:
+                deleted_count += db.session.execute(
+                    db.delete(Game).where(Game.id.in_(batch))
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+            mark_scores_stale()
+            logging.debug(f"Deleted {deleted_count} games")
         
         if deleted_count > 0:
             db.session.commit()
+            _game_team_names.cache_clear()
+            _game_filter_options.cache_clear()
             logging.info(f"Database commit completed. Deleted: {deleted_count}")
-        
-        if deleted_count > 0:
             flash(f'Successfully deleted {deleted_count} games', 'success')
-        
-        
+        else:
+            flash('No games were deleted', 'info')
+
         if errors:
             flash(f'Errors occurred: {"; ".join(errors)}', 'error')
-        
-        if deleted_count == 0:
-            flash('No games were deleted', 'info')
             
     except Exception as e:
         db.session.rollback()
@@ -2253,7 +2881,7 @@ def set_tournament_results():
         flash('Please select all three positions.', 'error')
         return redirect(url_for('admin'))
     
-    if len(set([first_place, second_place, third_place])) != 3:
+    if first_place == second_place or second_place == third_place or first_place == third_place:
         flash('Please select different teams for each position.', 'error')
         return redirect(url_for('admin'))
     
@@ -2268,13 +2896,16 @@ def set_tournament_results():
     tournament_config.third_place_result = third_place
     tournament_config.is_finalized = True
     
-    # Recalculate points for all tournament predictions
-    predictions = TournamentPrediction.query.all()
-    for prediction in predictions:
-        prediction.points_earned = calculate_tournament_points(prediction, tournament_config)
+    # Recalculate points for all tournament predictions in one UPDATE
+    updated_count = db.session.execute(
+        db.update(TournamentPrediction)
+        .values(points_earned=tournament_points_expression(tournament_config))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    mark_scores_stale()
     
     db.session.commit()
-    flash(f'Tournament results finalized! Points calculated for {len(predictions)} predictions.', 'success')
+    flash(f'Tournament results finalized! Points calculated for {updated_count} predictions.', 'success')
     return redirect(url_for('admin'))
 
 @app.route('/change-password', methods=['GET', 'POST'])
@@ -2319,26 +2950,13 @@ def tournament_predictions():
         return redirect(url_for('index'))
     
     # Get tournament teams (if available) or fallback to game teams
-    tournament_teams = TournamentTeam.query.order_by(TournamentTeam.name).all()
-    if tournament_teams:
-        teams = [team.name for team in tournament_teams]
-    else:
-        # Fallback to teams from games
-        teams = set()
-        games = Game.query.all()
-        for game in games:
-            teams.add(game.team1)
-            teams.add(game.team2)
-        teams = sorted(list(teams))
+    teams = list(get_tournament_team_names() or get_game_team_names())
     
     # Check if we have teams available
     if not teams:
         flash('No tournament teams available. Please contact admin to upload team list.', 'warning')
         return redirect(url_for('index'))
     
-    # Get user's existing prediction
-    user_prediction = TournamentPrediction.query.filter_by(user_id=current_user.id).first()
-    
     if request.method == 'POST':
         if not tournament_config.is_prediction_open():
             flash('Tournament prediction deadline has passed.', 'error')
@@ -2351,37 +2969,29 @@ def tournament_predictions():
         # Validation
         if not all([first_place, second_place, third_place]):
             flash('Please select all three positions.', 'error')
-            return render_template('tournament_predictions.html', 
-                                 tournament_config=tournament_config, 
-                                 teams=teams, 
-                                 user_prediction=user_prediction)
-        
         # Check for duplicate selections
-        if len(set([first_place, second_place, third_place])) != 3:
+        elif first_place == second_place or second_place == third_place or first_place == third_place:
             flash('Please select different teams for each position.', 'error')
-            return render_template('tournament_predictions.html', 
-                                 tournament_config=tournament_config, 
-                                 teams=teams, 
-                                 user_prediction=user_prediction)
-        
-        # Create or update prediction
-        if user_prediction:
-            user_prediction.first_place = first_place
-            user_prediction.second_place = second_place
-            user_prediction.third_place = third_place
-            user_prediction.updated_at = datetime.utcnow()
         else:
-            user_prediction = TournamentPrediction(
-                user_id=current_user.id,
-                first_place=first_place,
-                second_place=second_place,
-                third_place=third_place
-            )
-            db.session.add(user_prediction)
-        
-        db.session.commit()
-        flash('Tournament prediction saved successfully!', 'success')
-        return redirect(url_for('tournament_predictions'))
+            # Create or update prediction atomically, so double submits cannot race on user_id
+            now = datetime.utcnow()
+            values = {
+                'first_place': first_place,
+                'second_place': second_place,
+                'third_place': third_place,
+                'updated_at': now
+            }
+            stmt = dialect_insert(TournamentPrediction).values(user_id=current_user.id, created_at=now, **values)
+            stmt = stmt.on_conflict_do_update(index_elements=[TournamentPrediction.user_id], set_=values)
+            db.session.execute(stmt)
+            mark_scores_stale([current_user.id])
+            
+            db.session.commit()
+            flash('Tournament prediction saved successfully!', 'success')
+            return redirect(url_for('tournament_predictions'))
+    
+    # Get user's existing prediction
+    user_prediction = TournamentPrediction.query.filter_by(user_id=current_user.id).first()
     
     return render_template('tournament_predictions.html', 
                          tournament_config=tournament_config, 
@@ -2405,6 +3015,7 @@ def all_tournament_predictions():
     # Get all tournament predictions with user information, ordered by user name
     all_predictions = (TournamentPrediction.query
                       .join(User)
+                      .options(contains_eager(TournamentPrediction.user).load_only(User.id, User.name))
                       .order_by(User.name)
                       .all())
     
@@ -2418,16 +3029,28 @@ def all_tournament_predictions():
     }
     
     if tournament_config.are_results_available():
-        # Count correct predictions for each position
-        first_place_correct = len([p for p in all_predictions if p.first_place == tournament_config.first_place_result])
-        second_place_mentioned = len([p for p in all_predictions if tournament_config.second_place_result in [p.first_place, p.second_place, p.third_place]])
-        third_place_mentioned = len([p for p in all_predictions if tournament_config.third_place_result in [p.first_place, p.second_place, p.third_place]])
+        # Count correct predictions for each position in one aggregate query
+        def mentioned(team):
+            return db.func.coalesce(db.func.sum(db.case((db.or_(
+                TournamentPrediction.first_place == team,
+                TournamentPrediction.second_place == team,
+                TournamentPrediction.third_place == team), 1), else_=0)), 0)
+        
+        first_place_correct, second_place_mentioned, third_place_mentioned, points_total = db.session.execute(
+            db.select(
+                db.func.coalesce(db.func.sum(db.case(
+                    (TournamentPrediction.first_place == tournament_config.first_place_result, 1), else_=0)), 0),
+                mentioned(tournament_config.second_place_result),
+                mentioned(tournament_config.third_place_result),
+                db.func.coalesce(db.func.sum(TournamentPrediction.points_earned), 0)
+            ).join(User, TournamentPrediction.user_id == User.id)
+        ).one()
         
         stats.update({
             'first_place_correct': first_place_correct,
             'second_place_mentioned': second_place_mentioned, 
             'third_place_mentioned': third_place_mentioned,
-            'average_points': sum(p.points_earned for p in all_predictions) / max(total_participants, 1)
+            'average_points': points_total / max(total_participants, 1)
         })
     
     return render_template('all_tournament_predictions.html',
@@ -2438,7 +3061,11 @@ def all_tournament_predictions():
 @app.route('/get_prediction/<int:game_id>')
 @login_required
 def get_prediction(game_id):
-    prediction = Prediction.query.filter_by(user_id=current_user.id, game_id=game_id).first()
+    # Two columns only; loading a Prediction would also selectin-load its game
+    prediction = db.session.execute(
+        db.select(Prediction.team1_score, Prediction.team2_score)
+        .where(Prediction.user_id == current_user.id, Prediction.game_id == game_id)
+    ).first()
     if prediction:
         return jsonify({
             'team1_score': prediction.team1_score,
@@ -2463,43 +3090,38 @@ def save_prediction_ajax():
         team1_score = int(team1_score)
         team2_score = int(team2_score)
         
-        if team1_score < 0 or team2_score < 0:
-            return jsonify({'success': False, 'error': 'Scores cannot be negative'}), 400
-        
         # Volleyball scoring validation: one team must win 3 sets, other 0-2
-        if not ((team1_score == 3 and team2_score in [0, 1, 2]) or 
-                (team2_score == 3 and team1_score in [0, 1, 2])):
-            return jsonify({'success': False, 'error': 'Invalid volleyball score. Winner must have 3 sets, loser 0-2 sets.'}), 400
+        try:
+            validate_volleyball_score(team1_score, team2_score)
+        except ValueError as e:
+            error_msg = 'Invalid volleyball score. Winner must have 3 sets, loser 0-2 sets.' if "Invalid volleyball score" in str(e) else str(e)
+            return jsonify({'success': False, 'error': error_msg}), 400
         
-        game = Game.query.get(game_id)
+        game = db.session.execute(
+            db.select(Game.team1, Game.team2, Game.prediction_deadline).where(Game.id == game_id)
+        ).first()
         if not game:
             return jsonify({'success': False, 'error': 'Game not found'}), 404
         
         # Check prediction deadline - using Riga timezone
-        current_time = get_riga_time()
-        deadline = to_riga_time(game.prediction_deadline)
-        
-        if current_time >= deadline:
+        if get_riga_now_naive() >= game.prediction_deadline:
             return jsonify({'success': False, 'error': 'Prediction deadline has passed for this game'}), 400
         
-        # Check if prediction already exists
-        existing = Prediction.query.filter_by(user_id=current_user.id, game_id=game_id).first()
-        is_update = bool(existing)
-        
-        if existing:
-            existing.team1_score = team1_score
-            existing.team2_score = team2_score
-            existing.predicted_winner = game.team1 if team1_score > team2_score else game.team2
-        else:
-            predicted_winner = game.team1 if team1_score > team2_score else game.team2
-            prediction = Prediction(
-                user_id=current_user.id,
-                game_id=game_id,
-                team1_score=team1_score,
-                team2_score=team2_score,
-                predicted_winner=predicted_winner
-            )
-            db.session.add(prediction)
+        # Insert or update in one statement; created_at is kept on conflict,
+        # so a returned value other than ours means the row already existed
+        values = {
+            'team1_score': team1_score,
+            'team2_score': team2_score,
+            'predicted_winner': game.team1 if team1_score > team2_score else game.team2
+        }
+        created_at = datetime.utcnow()
+        stmt = dialect_insert(Prediction).values(
+            user_id=current_user.id, game_id=game_id, created_at=created_at, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Prediction.user_id, Prediction.game_id], set_=values
+        ).returning(Prediction.created_at)
+        is_update = db.session.execute(stmt).scalar_one() != created_at
+        mark_scores_stale([current_user.id])
         
         db.session.commit()
         
@@ -2525,18 +3147,24 @@ def game_predictions(game_id):
     if not game.are_predictions_visible():
         return jsonify({'error': 'Predictions not yet visible'}), 403
     
-    predictions = Prediction.query.filter_by(game_id=game_id).join(User).all()
+    # Select only the displayed columns - no ORM objects needed for the JSON payload
+    rows = db.session.execute(
+        db.select(User.name, Prediction.team1_score, Prediction.team2_score,
+                  Prediction.predicted_winner, Prediction.points)
+        .join(User, Prediction.user_id == User.id)
+        .where(Prediction.game_id == game_id)
+    )
     predictions_data = []
-    for pred in predictions:
+    for user_name, team1_score, team2_score, predicted_winner, points in rows:
         predictions_data.append({
-            'user_name': pred.user.name,
-            'team1_score': pred.team1_score,
-            'team2_score': pred.team2_score,
-            'predicted_winner': pred.predicted_winner,
-            'points': pred.points
+            'user_name': user_name,
+            'team1_score': team1_score,
+            'team2_score': team2_score,
+            'predicted_winner': predicted_winner,
+            'points': points
         })
     
-    return jsonify({
+    return fast_jsonify({
         'game': {
             'team1': game.team1,
             'team2': game.team2,
@@ -2548,23 +3176,16 @@ def game_predictions(game_id):
 @app.route('/user/<int:user_id>')
 @login_required
 def user_profile(user_id):
-    user = User.query.get_or_404(user_id)
+    user = User.query.options(joinedload(User.tournament_prediction)).get_or_404(user_id)
     
     # Get all predictions for games with passed deadline, ordered by game date
-    # Filter in Python to handle Riga timezone properly
-    all_predictions = (Prediction.query
+    all_deadline_passed_predictions = (Prediction.query
                       .join(Game)
-                      .filter(Prediction.user_id == user_id)
+                      .filter(Prediction.user_id == user_id, prediction_deadline_passed())
+                      .options(contains_eager(Prediction.game))
                       .order_by(Game.game_date.desc())
                       .all())
     
-    current_time = get_riga_time()
-    all_deadline_passed_predictions = []
-    for pred in all_predictions:
-        deadline = to_riga_time(pred.game.prediction_deadline)
-        if current_time >= deadline:
-            all_deadline_passed_predictions.append(pred)
-    
     # Include all predictions for detailed display (both real and default predictions)
     predictions = all_deadline_passed_predictions
     
@@ -2572,7 +3193,7 @@ def user_profile(user_id):
     total_predictions = user.get_total_predictions()
     correct_predictions = user.get_correct_predictions()
     # Use all deadline-passed predictions (including default) for total points calculation
-    total_points = sum([p.points for p in all_deadline_passed_predictions if p.points is not None])
+    total_points = sum(p.points for p in all_deadline_passed_predictions if p.points is not None)
     accuracy = user.get_accuracy_percentage()
     
     # Add tournament points if available
@@ -2597,9 +3218,7 @@ def match_detail(game_id):
     game = Game.query.get_or_404(game_id)
     
     # Only show if prediction deadline has passed - using Riga timezone
-    current_time = get_riga_time()
-    deadline = to_riga_time(game.prediction_deadline)
-    if current_time < deadline:
+    if get_riga_now_naive() < game.prediction_deadline:
         flash('Match predictions are not yet visible.', 'warning')
         return redirect(url_for('predictions'))
     
@@ -2607,6 +3226,7 @@ def match_detail(game_id):
     all_predictions = (Prediction.query
                       .filter_by(game_id=game_id)
                       .join(User)
+                      .options(contains_eager(Prediction.user).load_only(User.id, User.name))
                       .order_by(User.name)
                       .all())
     
@@ -2617,8 +3237,12 @@ def match_detail(game_id):
     real_predictions = [p for p in all_predictions if not p.is_default_prediction()]
     total_predictions = len(real_predictions)
     if game.is_finished:
-        correct_predictions = len([p for p in real_predictions if p.points and p.points > 0])
-        perfect_predictions = len([p for p in real_predictions if p.points == 6])
+        correct_predictions = perfect_predictions = 0
+        for p in real_predictions:
+            if p.points and p.points > 0:
+                correct_predictions += 1
+                if p.points == 6:
+                    perfect_predictions += 1
     else:
         correct_predictions = 0
         perfect_predictions = 0
@@ -2640,24 +3264,14 @@ def all_predictions():
     selected_pool = request.args.get('pool')
     
     # Base query: only games where deadline has passed - using Riga timezone
-    current_time = get_riga_time()
-    # Get all games and filter in Python to handle Riga timezone properly
-    all_games = Game.query.all()
-    games_with_passed_deadlines = []
-    
-    for game in all_games:
-        deadline = to_riga_time(game.prediction_deadline)
-        if current_time >= deadline:
-            games_with_passed_deadlines.append(game.id)
-    
-    # Now query with the filtered game IDs
-    games_query = Game.query.filter(Game.id.in_(games_with_passed_deadlines)) if games_with_passed_deadlines else Game.query.filter(False)
+    deadline_passed = prediction_deadline_passed()
+    games_query = Game.query.filter(deadline_passed)
     
     # Apply date filter if provided
     if selected_date:
         try:
             filter_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
-            games_query = games_query.filter(db.func.date(Game.game_date) == filter_date)
+            games_query = games_query.filter(game_date_range(filter_date))
         except ValueError:
             flash('Invalid date format', 'error')
     
@@ -2668,35 +3282,41 @@ def all_predictions():
     # Order by game date (most recent first)
     games = games_query.order_by(Game.game_date.desc()).all()
     
-    # Get all predictions for these games
+    # Get all predictions for these games in one query, grouped by game below; the
+    # per-game count of real predictions rides along as a window aggregate
+    predictions_by_game = {}
+    real_counts = {}
+    if games:
+        real_count = db.func.sum(db.case((Prediction.is_real(), 1), else_=0)).over(partition_by=Prediction.game_id)
+        prediction_rows = db.session.execute(
+            db.select(Prediction.game_id, User.name.label('user_name'), Prediction.team1_score,
+                      Prediction.team2_score, Prediction.predicted_winner, Prediction.points,
+                      real_count.label('real_count'))
+            .join(User, Prediction.user_id == User.id)
+            .where(Prediction.game_id.in_([game.id for game in games]))
+            .order_by(Prediction.game_id, Prediction.id)
+        ).mappings()
+        for game_id, rows in groupby(prediction_rows, key=itemgetter('game_id')):
+            predictions_by_game[game_id] = [dict(row) for row in rows]
+            real_counts[game_id] = predictions_by_game[game_id][0]['real_count']
+    
     games_with_predictions = []
     for game in games:
-        all_predictions = Prediction.query.filter_by(game_id=game.id).join(User).all()
-        
-        # Include both real and default predictions for display, but separate them
-        predictions_data = []
-        for pred in all_predictions:
-            predictions_data.append({
-                'user_name': pred.user.name,
-                'team1_score': pred.team1_score,
-                'team2_score': pred.team2_score,
-                'predicted_winner': pred.predicted_winner,
-                'points': pred.points
-            })
-        
-        # Count only real predictions for the summary
-        real_predictions_count = len([pred for pred in all_predictions if not pred.is_default_prediction()])
-        
         games_with_predictions.append({
             'game': game,
-            'predictions': predictions_data,
-            'total_predictions': real_predictions_count  # Still counts only real predictions
+            # Include both real and default predictions for display
+            'predictions': predictions_by_game.get(game.id, []),
+            'total_predictions': real_counts.get(game.id, 0)  # Still counts only real predictions
         })
     
     # Get unique dates and pools for filtering - use games with passed deadlines
-    filtered_games = [game for game in all_games if game.id in games_with_passed_deadlines] if games_with_passed_deadlines else []
-    unique_dates = sorted(list(set(game.game_date.date() for game in filtered_games)), reverse=True) if filtered_games else []
-    unique_pools = sorted(list(set(game.round_name for game in filtered_games))) if filtered_games else []
+    game_day = db.func.date(Game.game_date, type_=db.Date)
+    unique_dates = db.session.scalars(
+        db.select(game_day).where(deadline_passed).distinct().order_by(game_day.desc())
+    ).all()
+    unique_pools = db.session.scalars(
+        db.select(Game.round_name).where(deadline_passed).distinct().order_by(Game.round_name)
+    ).all()
     
     return render_template('all_predictions.html', 
                          games_with_predictions=games_with_predictions,
@@ -2727,13 +3347,8 @@ def admin_manage_prediction():
         team1_score = int(team1_score)
         team2_score = int(team2_score)
         
-        if team1_score < 0 or team2_score < 0:
-            raise ValueError("Scores cannot be negative")
-        
         # Volleyball scoring validation: one team must win 3 sets, other 0-2
-        if not ((team1_score == 3 and team2_score in [0, 1, 2]) or 
-                (team2_score == 3 and team1_score in [0, 1, 2])):
-            raise ValueError("Invalid volleyball score")
+        validate_volleyball_score(team1_score, team2_score)
             
     except ValueError as e:
         error_msg = 'Invalid volleyball score. Winner must have 3 sets, loser 0-2 sets.' if "Invalid volleyball score" in str(e) else 'Please enter valid values'
@@ -2742,25 +3357,28 @@ def admin_manage_prediction():
         flash(error_msg, 'error')
         return redirect(url_for('admin'))
     
-    # Verify user and game exist
-    user = User.query.get(user_id)
-    game = Game.query.get(game_id)
+    # Verify user and game exist and fetch any existing prediction, all in one query
+    row = db.session.execute(
+        db.select(User.name, Game, Prediction)
+        .select_from(User)
+        .outerjoin(Game, Game.id == game_id)
+        .outerjoin(Prediction, db.and_(Prediction.user_id == User.id, Prediction.game_id == Game.id))
+        .where(User.id == user_id)
+    ).first()
     
-    if not user:
+    if not row:
         if request.headers.get('Content-Type') == 'application/x-www-form-urlencoded':
             return jsonify({'success': False, 'error': 'User not found'}), 404
         flash('User not found', 'error')
         return redirect(url_for('admin'))
 
+    user_name, game, existing = row
     if not game:
         if request.headers.get('Content-Type') == 'application/x-www-form-urlencoded':
             return jsonify({'success': False, 'error': 'Game not found'}), 404
         flash('Game not found', 'error')
         return redirect(url_for('admin'))
     
-    # Check if prediction already exists
-    existing = Prediction.query.filter_by(user_id=user_id, game_id=game_id).first()
-    
     predicted_winner = game.team1 if team1_score > team2_score else game.team2
     
     if existing:
@@ -2772,7 +3390,7 @@ def admin_manage_prediction():
         if game.is_finished:
             existing.points = calculate_points(existing, game)
         
-        success_msg = f'Prediction updated for {user.name}: {game.team1} vs {game.team2}'
+        success_msg = f'Prediction updated for {user_name}: {game.team1} vs {game.team2}'
         action = 'updated'
     else:
         prediction = Prediction(
@@ -2788,7 +3406,7 @@ def admin_manage_prediction():
             prediction.points = calculate_points(prediction, game)
 
         db.session.add(prediction)
-        success_msg = f'Prediction created for {user.name}: {game.team1} vs {game.team2}'
+        success_msg = f'Prediction created for {user_name}: {game.team1} vs {game.team2}'
         action = 'created'
 
     db.session.commit()
@@ -2960,22 +3578,20 @@ def auto_detect_highlights():
 
             # Get the most recent completed games that don't have highlights yet
             # Focus on the latest games that would appear on the highlights page
-            all_recent_games = db.session.query(Game).filter(
+            recent_games = db.select(Game.id).where(
                 Game.is_finished == True,
                 Game.team1_score.isnot(None),
                 Game.team2_score.isnot(None)
-            ).order_by(Game.game_date.desc()).limit(5).all()  # Get latest 5 completed games
+            ).order_by(Game.game_date.desc()).limit(5).subquery()  # Latest 5 completed games
 
-            # Filter to only those without highlights
-            games_without_highlights = []
-            for game in all_recent_games:
-                existing_highlights = db.session.query(GameHighlight).filter_by(game_id=game.id).count()
-                if existing_highlights == 0:
-                    games_without_highlights.append(game)
-
-                # Limit to max 2 games per run (since we show 2 on highlights page)
-                if len(games_without_highlights) >= 2:
-                    break
+            # Only those without highlights, in one anti-join query;
+            # max 2 games per run (since we show 2 on highlights page)
+            games_without_highlights = (Game.query
+                                        .join(recent_games, recent_games.c.id == Game.id)
+                                        .filter(~db.exists().where(GameHighlight.game_id == Game.id))
+                                        .order_by(Game.game_date.desc())
+                                        .limit(2)
+                                        .all())
 
             if not games_without_highlights:
                 logging.debug("Auto-highlight: No games without highlights found")
@@ -3058,6 +3674,11 @@ def init_scheduler():
             logging.info("SerpAPI key not found - automatic result updates disabled")
             return
 
+        # Only one process may own the scheduler; every gunicorn worker imports this module
+        if os.environ.get('RUN_SCHEDULER') != '1':
+            logging.info("RUN_SCHEDULER not set - background scheduler disabled in this process")
+            return
+
         # Check if scheduler should run (avoid in development/debug mode)
         if os.environ.get('FLASK_ENV') == 'development':
             logging.info("Development mode detected - automatic result updates disabled")
@@ -3070,6 +3691,8 @@ def init_scheduler():
             func=auto_update_results,
             trigger=IntervalTrigger(hours=2),
             id='auto_update_results',
+            max_instances=1,
+            coalesce=True,
             name='Automatic volleyball result updates',
             replace_existing=True
         )
@@ -3079,6 +3702,8 @@ def init_scheduler():
             func=auto_detect_highlights,
             trigger=IntervalTrigger(hours=4),
             id='auto_detect_highlights',
+            max_instances=1,
+            coalesce=True,
             name='Automatic volleyball highlight detection',
             replace_existing=True
         )
@@ -3093,140 +3718,275 @@ def init_scheduler():
         logging.error(f"Failed to initialize background scheduler: {e}")
 
 
-# Initialize database
-with app.app_context():
+# Bump when models or the migration steps below change so workers re-run them on boot
+SCHEMA_VERSION = 11
+
+def get_schema_version():
+    """Return the stored schema version, or None if it has not been recorded yet"""
     try:
-        # Create all tables (this will only create missing tables)
-        db.create_all()
-        logging.info("Database tables initialized successfully")
-        
-        # Check if we need to add the password_reset_required column
-        inspector = db.inspect(db.engine)
-        existing_tables = inspector.get_table_names()
+        meta = db.session.get(SchemaMeta, 'version')
+        return int(meta.value) if meta else None
+    except Exception:
+        db.session.rollback()
+        return None
+
+def set_schema_version(version):
+    """Record the schema version so later boots can skip inspection"""
+    meta = db.session.get(SchemaMeta, 'version')
+    if meta:
+        meta.value = str(version)
+    else:
+        db.session.add(SchemaMeta(key='version', value=str(version)))
+    db.session.commit()
+
+def rebuild_sqlite_table(table):
+    """Recreate a SQLite table from its model, keeping the rows, so constraint changes take effect"""
+    old_name = f'{table.name}_old'
+    with db.engine.connect() as conn:
+        # Foreign keys must be off while the table is swapped; the pragma is a no-op inside a transaction
+        conn.exec_driver_sql('PRAGMA foreign_keys=OFF')
+        conn.commit()
+        try:
+            table_inspector = db.inspect(conn)
+            existing_columns = {column['name'] for column in table_inspector.get_columns(table.name)}
+            # Index names are global in SQLite, so drop them before create() reuses them
+            for index in table_inspector.get_indexes(table.name):
+                conn.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+            conn.exec_driver_sql(f'ALTER TABLE "{table.name}" RENAME TO "{old_name}"')
+            table.create(conn)
+            columns = ', '.join(f'"{column.name}"' for column in table.columns if column.name in existing_columns)
+            conn.exec_driver_sql(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{old_name}"')
+            conn.exec_driver_sql(f'DROP TABLE "{old_name}"')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.exec_driver_sql('PRAGMA foreign_keys=ON')
+            conn.commit()
+
+def apply_schema_migrations():
+    """Create missing tables and add columns introduced after the initial release"""
+    # Create all tables (this will only create missing tables)
+    db.create_all()
+    logging.info("Database tables initialized successfully")
+    
+    # Check if we need to add the password_reset_required column
+    inspector = db.inspect(db.engine)
+    existing_tables = inspector.get_table_names()
+    
+    if 'user' in existing_tables:
+        user_columns = [col['name'] for col in inspector.get_columns('user')]
+        if 'password_reset_required' not in user_columns:
+            logging.info("Adding password_reset_required column to existing User table...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE "user" ADD COLUMN password_reset_required BOOLEAN DEFAULT FALSE'))
+                conn.commit()
+            logging.info("password_reset_required column added successfully")
+
+        # Denormalized score columns, backfilled once all migrations have run
+        score_columns = ('total_score', 'filled_count', 'finished_count', 'correct_count', 'finished_correct_count')
+        missing_score_columns = [name for name in score_columns if name not in user_columns]
+        if missing_score_columns:
+            logging.info("Adding denormalized score columns to existing User table...")
+            with db.engine.connect() as conn:
+                for name in missing_score_columns:
+                    conn.execute(db.text(f'ALTER TABLE "user" ADD COLUMN {name} INTEGER DEFAULT 0'))
+                conn.commit()
+            logging.info("Denormalized score columns added successfully")
+        elif db.engine.dialect.name == 'postgresql':
+            # Columns added before they had a server default; SQLite cannot alter defaults
+            with db.engine.connect() as conn:
+                for name in score_columns:
+                    conn.execute(db.text(f'ALTER TABLE "user" ALTER COLUMN {name} SET DEFAULT 0'))
+                conn.commit()
+    
+    # Check if we need to add the country_code column to tournament_team table
+    if 'tournament_team' in existing_tables:
+        team_columns = [col['name'] for col in inspector.get_columns('tournament_team')]
+        if 'country_code' not in team_columns:
+            logging.info("Adding country_code column to existing TournamentTeam table...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE tournament_team ADD COLUMN country_code VARCHAR(2)'))
+                conn.commit()
+            logging.info("country_code column added successfully")
+            
+            # Update existing teams with country codes
+            teams_to_update = [
+                ('Brazil', 'br'), ('USA', 'us'), ('Poland', 'pl'), ('Italy', 'it'),
+                ('Serbia', 'rs'), ('Turkey', 'tr'), ('Japan', 'jp'), ('China', 'cn'),
+                ('Netherlands', 'nl'), ('Dominican Republic', 'do'), ('France', 'fr'),
+                ('Germany', 'de'), ('Thailand', 'th'), ('Belgium', 'be'), ('Canada', 'ca'),
+                ('Bulgaria', 'bg'), ('Argentina', 'ar'), ('Slovenia', 'si'),
+                ('Czech Republic', 'cz'), ('Puerto Rico', 'pr'), ('Ukraine', 'ua'),
+                ('Russia', 'ru'), ('South Korea', 'kr'), ('Croatia', 'hr')
+            ]
+            
+            # Single UPDATE with a CASE expression instead of one statement per team
+            params = {}
+            when_clauses = []
+            for i, (team_name, country_code) in enumerate(teams_to_update):
+                params[f'n{i}'] = team_name
+                params[f'c{i}'] = country_code
+                when_clauses.append(f'WHEN :n{i} THEN :c{i}')
+            name_params = ', '.join(f':n{i}' for i in range(len(teams_to_update)))
+
+            with db.engine.connect() as conn:
+                conn.execute(
+                    db.text(f'UPDATE tournament_team SET country_code = CASE name {" ".join(when_clauses)} END '
+                            f'WHERE name IN ({name_params})'),
+                    params
+                )
+                conn.commit()
+            logging.info("Updated country codes for existing teams")
+    
+    # Check if we need to add new columns to player_message table
+    if 'player_message' in existing_tables:
+        player_message_columns = [col['name'] for col in inspector.get_columns('player_message')]
         
-        if 'user' in existing_tables:
-            user_columns = [col['name'] for col in inspector.get_columns('user')]
-            if 'password_reset_required' not in user_columns:
-                logging.info("Adding password_reset_required column to existing User table...")
-                with db.engine.connect() as conn:
-                    conn.execute(db.text('ALTER TABLE "user" ADD COLUMN password_reset_required BOOLEAN DEFAULT FALSE'))
-                    conn.commit()
-                logging.info("password_reset_required column added successfully")
+        # Add last_viewed_at column if missing
+        if 'last_viewed_at' not in player_message_columns:
+            logging.info("Adding last_viewed_at column to existing PlayerMessage table...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE player_message ADD COLUMN last_viewed_at TIMESTAMP'))
+                conn.commit()
+            logging.info("last_viewed_at column added successfully")
         
-        # Check if we need to add the country_code column to tournament_team table
-        if 'tournament_team' in existing_tables:
-            team_columns = [col['name'] for col in inspector.get_columns('tournament_team')]
-            if 'country_code' not in team_columns:
-                logging.info("Adding country_code column to existing TournamentTeam table...")
-                with db.engine.connect() as conn:
-                    conn.execute(db.text('ALTER TABLE tournament_team ADD COLUMN country_code VARCHAR(2)'))
-                    conn.commit()
-                logging.info("country_code column added successfully")
-                
-                # Update existing teams with country codes
-                teams_to_update = [
-                    ('Brazil', 'br'), ('USA', 'us'), ('Poland', 'pl'), ('Italy', 'it'),
-                    ('Serbia', 'rs'), ('Turkey', 'tr'), ('Japan', 'jp'), ('China', 'cn'),
-                    ('Netherlands', 'nl'), ('Dominican Republic', 'do'), ('France', 'fr'),
-                    ('Germany', 'de'), ('Thailand', 'th'), ('Belgium', 'be'), ('Canada', 'ca'),
-                    ('Bulgaria', 'bg'), ('Argentina', 'ar'), ('Slovenia', 'si'),
-                    ('Czech Republic', 'cz'), ('Puerto Rico', 'pr'), ('Ukraine', 'ua'),
-                    ('Russia', 'ru'), ('South Korea', 'kr'), ('Croatia', 'hr')
-                ]
-                
-                with db.engine.connect() as conn:
-                    for team_name, country_code in teams_to_update:
-                        try:
-                            conn.execute(
-                                db.text('UPDATE tournament_team SET country_code = :code WHERE name = :name'),
-                                {'code': country_code, 'name': team_name}
-                            )
-                        except:
-                            pass  # Continue if team doesn't exist
-                    conn.commit()
-                logging.info("Updated country codes for existing teams")
+        # Add latest_results_hash column if missing
+        if 'latest_results_hash' not in player_message_columns:
+            logging.info("Adding latest_results_hash column to existing PlayerMessage table...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE player_message ADD COLUMN latest_results_hash VARCHAR(32)'))
+                conn.commit()
+            logging.info("latest_results_hash column added successfully")
         
-        # Check if we need to add new columns to player_message table
-        if 'player_message' in existing_tables:
-            player_message_columns = [col['name'] for col in inspector.get_columns('player_message')]
-            
-            # Add last_viewed_at column if missing
-            if 'last_viewed_at' not in player_message_columns:
-                logging.info("Adding last_viewed_at column to existing PlayerMessage table...")
-                with db.engine.connect() as conn:
-                    conn.execute(db.text('ALTER TABLE player_message ADD COLUMN last_viewed_at TIMESTAMP'))
-                    conn.commit()
-                logging.info("last_viewed_at column added successfully")
-            
-            # Add latest_results_hash column if missing
-            if 'latest_results_hash' not in player_message_columns:
-                logging.info("Adding latest_results_hash column to existing PlayerMessage table...")
-                with db.engine.connect() as conn:
-                    conn.execute(db.text('ALTER TABLE player_message ADD COLUMN latest_results_hash VARCHAR(32)'))
-                    conn.commit()
-                logging.info("latest_results_hash column added successfully")
-
-        # Check if we need to add SerpApi columns to game table
-        if 'game' in existing_tables:
-            game_columns = [col['name'] for col in inspector.get_columns('game')]
-
-            # Add auto_update_attempted column if missing
-            if 'auto_update_attempted' not in game_columns:
-                logging.info("Adding auto_update_attempted column to existing Game table...")
-                with db.engine.connect() as conn:
-                    conn.execute(db.text('ALTER TABLE game ADD COLUMN auto_update_attempted BOOLEAN DEFAULT FALSE'))
-                    conn.commit()
-                logging.info("auto_update_attempted column added successfully")
-
-            # Add auto_update_timestamp column if missing
-            if 'auto_update_timestamp' not in game_columns:
-                logging.info("Adding auto_update_timestamp column to existing Game table...")
-                with db.engine.connect() as conn:
-                    conn.execute(db.text('ALTER TABLE game ADD COLUMN auto_update_timestamp TIMESTAMP'))
-                    conn.commit()
-                logging.info("auto_update_timestamp column added successfully")
-
-            # Add result_source column if missing
-            if 'result_source' not in game_columns:
-                logging.info("Adding result_source column to existing Game table...")
-                with db.engine.connect() as conn:
-                    conn.execute(db.text("ALTER TABLE game ADD COLUMN result_source VARCHAR(50) DEFAULT 'manual'"))
-                    conn.commit()
-                logging.info("result_source column added successfully")
-
-            # Add serpapi_search_used column if missing
-            if 'serpapi_search_used' not in game_columns:
-                logging.info("Adding serpapi_search_used column to existing Game table...")
-                with db.engine.connect() as conn:
-                    conn.execute(db.text('ALTER TABLE game ADD COLUMN serpapi_search_used BOOLEAN DEFAULT FALSE'))
-                    conn.commit()
-                logging.info("serpapi_search_used column added successfully")
-
-        # Check if we need to create the game_highlight table
-        if 'game_highlight' not in existing_tables:
-            logging.info("Creating GameHighlight table...")
-            # The table will be created automatically by db.create_all() above
-            # But we log it for transparency
-            try:
-                # Verify the table was created
-                db.session.execute(db.text('SELECT 1 FROM game_highlight LIMIT 1'))
-                logging.info("GameHighlight table created successfully")
-            except Exception:
-                # Table doesn't exist yet, which is expected on first run
-                logging.info("GameHighlight table will be created by db.create_all()")
-
-        # Check if we need to create the featured_video table
-        if 'featured_video' not in existing_tables:
-            logging.info("Creating FeaturedVideo table...")
-            # The table will be created automatically by db.create_all() above
-            # But we log it for transparency
-            try:
-                # Verify the table was created
-                db.session.execute(db.text('SELECT 1 FROM featured_video LIMIT 1'))
-                logging.info("FeaturedVideo table created successfully")
-            except Exception:
-                # Table doesn't exist yet, which is expected on first run
-                logging.info("FeaturedVideo table will be created by db.create_all()")
+        # Keep only the newest message per user so the unique index below can be created
+        player_message_indexes = {index['name'] for index in inspector.get_indexes('player_message')}
+        if 'uq_player_message_user_id' not in player_message_indexes:
+            with db.engine.connect() as conn:
+                conn.execute(db.text(
+                    'DELETE FROM player_message WHERE id NOT IN '
+                    '(SELECT MAX(id) FROM player_message GROUP BY user_id)'
+                ))
+                conn.commit()
+
+    # Check if we need to add SerpApi columns to game table
+    if 'game' in existing_tables:
+        game_columns = [col['name'] for col in inspector.get_columns('game')]
+
+        # Add auto_update_attempted column if missing
+        if 'auto_update_attempted' not in game_columns:
+            logging.info("Adding auto_update_attempted column to existing Game table...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE game ADD COLUMN auto_update_attempted BOOLEAN DEFAULT FALSE'))
+                conn.commit()
+            logging.info("auto_update_attempted column added successfully")
+
+        # Add auto_update_timestamp column if missing
+        if 'auto_update_timestamp' not in game_columns:
+            logging.info("Adding auto_update_timestamp column to existing Game table...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE game ADD COLUMN auto_update_timestamp TIMESTAMP'))
+                conn.commit()
+            logging.info("auto_update_timestamp column added successfully")
+
+        # Add result_source column if missing
+        if 'result_source' not in game_columns:
+            logging.info("Adding result_source column to existing Game table...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text("ALTER TABLE game ADD COLUMN result_source VARCHAR(50) DEFAULT 'manual'"))
+                conn.commit()
+            logging.info("result_source column added successfully")
+
+        # Add serpapi_search_used column if missing
+        if 'serpapi_search_used' not in game_columns:
+            logging.info("Adding serpapi_search_used column to existing Game table...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE game ADD COLUMN serpapi_search_used BOOLEAN DEFAULT FALSE'))
+                conn.commit()
+            logging.info("serpapi_search_used column added successfully")
+
+    # Check if we need to create the game_highlight table
+    if 'game_highlight' not in existing_tables:
+        logging.info("Creating GameHighlight table...")
+        # The table will be created automatically by db.create_all() above
+        # But we log it for transparency
+        try:
+            # Verify the table was created
+            db.session.execute(db.text('SELECT 1 FROM game_highlight LIMIT 1'))
+            logging.info("GameHighlight table created successfully")
+        except Exception:
+            # Table doesn't exist yet, which is expected on first run
+            logging.info("GameHighlight table will be created by db.create_all()")
+
+    # Check if we need to create the featured_video table
+    if 'featured_video' not in existing_tables:
+        logging.info("Creating FeaturedVideo table...")
+        # The table will be created automatically by db.create_all() above
+        # But we log it for transparency
+        try:
+            # Verify the table was created
+            db.session.execute(db.text('SELECT 1 FROM featured_video LIMIT 1'))
+            logging.info("FeaturedVideo table created successfully")
+        except Exception:
+            # Table doesn't exist yet, which is expected on first run
+            logging.info("FeaturedVideo table will be created by db.create_all()")
+
+    # Game deletes cascade to predictions and highlights in the database
+    for table in (Prediction.__table__, GameHighlight.__table__):
+        for fk in inspector.get_foreign_keys(table.name):
+            if fk['referred_table'] != 'game' or (fk.get('options') or {}).get('ondelete', '').upper() == 'CASCADE':
+                continue
+            if db.engine.dialect.name == 'sqlite':
+                # SQLite cannot alter constraints, so rebuild the table from the model instead
+                logging.info(f"Rebuilding {table.name} to add ON DELETE CASCADE to game_id...")
+                rebuild_sqlite_table(table)
+                logging.info(f"Table {table.name} rebuilt with a cascading foreign key")
+                break
+            logging.info(f"Adding ON DELETE CASCADE to {table.name}.game_id...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text(f'ALTER TABLE {table.name} DROP CONSTRAINT {fk["name"]}'))
+                conn.execute(db.text(
+                    f'ALTER TABLE {table.name} ADD CONSTRAINT {fk["name"]} '
+                    f'FOREIGN KEY (game_id) REFERENCES game (id) ON DELETE CASCADE'))
+                conn.commit()
+            logging.info(f"Foreign key {fk['name']} now cascades")
+
+    # create_all() does not add new indexes to existing tables
+    for table in (Game.__table__, Prediction.__table__, PlayerMessage.__table__, GameHighlight.__table__):
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                logging.info(f"Creating index {index.name}...")
+                index.create(db.engine)
+                logging.info(f"Index {index.name} created successfully")
+
+    # Keep the denormalized score columns in sync with the predictions table
+    User.refresh_stored_stats()
+    db.session.commit()
+    logging.info("Denormalized user score columns refreshed")
+
+def refresh_missing_stored_stats():
+    """Compute the denormalized score columns for users that have never had them stored"""
+    missing = db.session.scalars(db.select(User.id).where(User.total_score.is_(None))).all()
+    if missing:
+        User.refresh_stored_stats(missing)
+        db.session.commit()
+        logging.info(f"Stored score columns filled for {len(missing)} users")
+
+
+# Initialize database
+with app.app_context():
+    try:
+        if get_schema_version() == SCHEMA_VERSION:
+            logging.info(f"Database schema is up to date (version {SCHEMA_VERSION})")
+        else:
+            apply_schema_migrations()
+            set_schema_version(SCHEMA_VERSION)
+            logging.info(f"Database schema migrated to version {SCHEMA_VERSION}")
+
+        # Stored totals left NULL by raw SQL inserts are filled on every boot, not only on migration
+        refresh_missing_stored_stats()
 
         # Initialize logging configuration
         try:
@@ -3239,8 +3999,8 @@ with app.app_context():
             # Set default log level
             logging.getLogger().setLevel(logging.INFO)
 
-        # Initialize background scheduler for automatic result updates
-        # init_scheduler()  # Disabled - run updates manually from admin page
+        # Background scheduler for automatic result updates; only starts where RUN_SCHEDULER=1
+        init_scheduler()
 
     except Exception as e:
         logging.error(f"Database initialization error: {e}")
@@ -3258,20 +4018,22 @@ def potential_points():
         # Debug logging for what-if analysis
         logging.debug(f"What-if analysis - Current time: {current_time}")
 
-        all_games = Game.query.all()
-        unfinished_games = Game.query.filter_by(is_finished=False).all()
+        # Loading every unfinished game only serves the debug log, so skip it otherwise
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            total_games = db.session.scalar(db.select(db.func.count(Game.id)))
+            unfinished_games = Game.query.filter_by(is_finished=False).all()
 
-        logging.debug(f"What-if analysis - Total games: {len(all_games)}")
-        logging.debug(f"What-if analysis - Unfinished games: {len(unfinished_games)}")
+            logging.debug(f"What-if analysis - Total games: {total_games}")
+            logging.debug(f"What-if analysis - Unfinished games: {len(unfinished_games)}")
 
-        for game in unfinished_games:
-            # Convert deadline to Riga timezone for comparison
-            game_deadline = to_riga_time(game.prediction_deadline)
-            deadline_passed = game_deadline < current_time
-            logging.debug(f"What-if analysis - Game: {game.team1} vs {game.team2}")
-            logging.debug(f"  Deadline: {game.prediction_deadline} -> {game_deadline}")
-            logging.debug(f"  Deadline passed: {deadline_passed}")
-            logging.debug(f"  Is finished: {game.is_finished}")
+            for game in unfinished_games:
+                # Convert deadline to Riga timezone for comparison
+                game_deadline = to_riga_time(game.prediction_deadline)
+                deadline_passed = game_deadline < current_time
+                logging.debug(f"What-if analysis - Game: {game.team1} vs {game.team2}")
+                logging.debug(f"  Deadline: {game.prediction_deadline} -> {game_deadline}")
+                logging.debug(f"  Deadline passed: {deadline_passed}")
+                logging.debug(f"  Is finished: {game.is_finished}")
 
         # Convert current time to naive datetime for database comparison
         current_time_naive = current_time.replace(tzinfo=None)
@@ -3327,7 +4089,7 @@ def potential_points():
     for user in users:
         user_data[user.id] = {
             'user': user,
-            'current_total': user.get_total_score(),
+            'current_total': user.total_score or 0,
             'prediction': None
         }
 
@@ -3734,11 +4496,7 @@ def add_highlight():
             return jsonify({'success': False, 'error': 'Game not found'})
 
         # Extract video ID from URL
-        video_id = None
-        if 'youtube.com/watch?v=' in youtube_url:
-            video_id = youtube_url.split('youtube.com/watch?v=')[-1].split('&')[0]
-        elif 'youtu.be/' in youtube_url:
-            video_id = youtube_url.split('youtu.be/')[-1].split('?')[0]
+        video_id = extract_youtube_video_id(youtube_url)
 
         if not video_id:
             return jsonify({'success': False, 'error': 'Invalid YouTube URL'})
@@ -3918,11 +4676,7 @@ def add_featured_video():
             return jsonify({'success': False, 'error': 'YouTube URL is required'})
 
         # Extract video ID from URL
-        video_id = None
-        if 'youtube.com/watch?v=' in youtube_url:
-            video_id = youtube_url.split('youtube.com/watch?v=')[-1].split('&')[0]
-        elif 'youtu.be/' in youtube_url:
-            video_id = youtube_url.split('youtu.be/')[-1].split('?')[0]
+        video_id = extract_youtube_video_id(youtube_url)
 
         if not video_id:
             return jsonify({'success': False, 'error': 'Invalid YouTube URL'})
@@ -0,0 +1,6 @@
+"""
+Constants shared by the web app and the result fetcher
+"""
+
+# Valid volleyball match results: winner takes 3 sets, loser 0-2
+VALID_VB_SCORES = frozenset({(3, 0), (3, 1), (3, 2), (0, 3), (1, 3), (2, 3)})
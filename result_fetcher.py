@@ -7,6 +7,8 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
 
+from constants import VALID_VB_SCORES
+
 try:
     import serpapi
     SERPAPI_AVAILABLE = True
@@ -235,8 +237,7 @@ class VolleyballResultFetcher:
     def _is_valid_volleyball_score(self, score1: int, score2: int) -> bool:
         """Check if score represents a valid volleyball match result"""
         # Winner must have 3 sets, loser must have 0-2 sets
-        return ((score1 == 3 and score2 in [0, 1, 2]) or
-                (score2 == 3 and score1 in [0, 1, 2]))
+        return (score1, score2) in VALID_VB_SCORES
 
     def _is_team_match(self, found_name: str, target_name: str) -> bool:
         """Check if found team name matches target team name"""